@@ -10,26 +10,29 @@ import io
 import json
 import math
 import os
+import re
 import sqlite3
 import sys
 import tempfile
-import uuid
+import threading
 import warnings
+import weakref
 import shiboken6
+from array import array
+from contextlib import contextmanager
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
-import pypdfium2 as pdfium
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types as genai_types
-from pdf2image import convert_from_bytes
-from PIL import Image
-from PySide6.QtCore import QBuffer, QByteArray, QDate, QIODevice, QPointF, QRectF, QSize, QSizeF, Qt, Signal, QThread, QObject, QTimer, QEvent
-from PySide6.QtGui import QAction, QFont, QImage, QPainter, QPixmap, QColor, QIcon, QPen
+from PySide6.QtCore import QAbstractListModel, QBuffer, QByteArray, QDate, QIODevice, QModelIndex, QRect, QRunnable, QSignalBlocker, QSize, QStringListModel, Qt, Signal, QThread, QThreadPool, QObject, QTimer, QEvent
+from PySide6.QtGui import QAction, QFont, QImage, QImageReader, QPainter, QPalette, QPixmap, QColor, QIcon, QPen, QStandardItem, QStandardItemModel
 from PySide6.QtMultimedia import QCamera, QImageCapture, QMediaCaptureSession, QMediaDevices
 from PySide6.QtMultimediaWidgets import QVideoWidget
-from PySide6.QtPdf import QPdfDocument
 from PySide6.QtCharts import (
     QBarCategoryAxis,
     QBarSet,
@@ -52,16 +55,20 @@ from PySide6.QtWidgets import (
     QHeaderView,
     QLabel,
     QLineEdit,
-    QListWidget,
-    QListWidgetItem,
+    QListView,
     QMainWindow,
     QMenuBar,
     QMessageBox,
     QPushButton,
     QScrollArea,
     QSizePolicy,
+    QSplashScreen,
     QScroller,
     QStackedWidget,
+    QStyle,
+    QStyledItemDelegate,
+    QStyleOptionButton,
+    QStyleOptionViewItem,
     QTabWidget,
     QTableWidget,
     QTableWidgetItem,
@@ -137,22 +144,34 @@ def bs_icon(account_code: str, account_type: str) -> str:
         return "💳"
     return "•"
 
-def fmt_money(amount: float, ccy: str) -> str:
-    sign = "-" if amount < 0 else ""
-    return f"{sign}{ccy} {abs(amount):,.2f}"
+@lru_cache(maxsize=8)
+def money_formatter(ccy: str) -> Callable[[float], str]:
+    """Amount formatter with `ccy` baked into the templates, for per-row loops."""
+    pos = f"{ccy} {{:,.2f}}".format
+    neg = f"-{ccy} {{:,.2f}}".format
+
+    def fmt(amount: float) -> str:
+        # "+ 0.0" folds -0.0 so it still renders as "CCY 0.00".
+        return neg(-amount) if amount < 0 else pos(amount + 0.0)
+    return fmt
 
 def now_iso() -> str:
     return dt.datetime.now().replace(microsecond=0).isoformat()
 
 def qdate_to_iso(d: QDate) -> str:
-    return f"{d.year():04d}-{d.month():02d}-{d.day():02d}"
+    return d.toString(Qt.ISODate)
 
 def iso_to_qdate(s: str) -> QDate:
-    y, m, d = map(int, s.split("-"))
-    return QDate(y, m, d)
+    return QDate.fromString(s, Qt.ISODate)
 
-def new_uuid() -> str:
-    return str(uuid.uuid4())
+def new_uuid(_urandom=os.urandom) -> str:
+    # Random (version 4) UUID in the usual dashed form, without the
+    # uuid.UUID object round-trip.
+    b = bytearray(_urandom(16))
+    b[6] = (b[6] & 0x0F) | 0x40
+    b[8] = (b[8] & 0x3F) | 0x80
+    h = b.hex()
+    return f"{h[0:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:32]}"
 
 
 # -------------------------
@@ -162,30 +181,68 @@ def new_uuid() -> str:
 ATTACH_MAX_BYTES = 10 * 1024 * 1024  # 10MB
 ALLOWED_MIME = {"image/jpeg", "image/png", "application/pdf"}
 
+_EXT_MIME = {
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "pdf": "application/pdf",
+}
+
+def read_file_capped(path: str, limit: int = ATTACH_MAX_BYTES) -> Optional[bytes]:
+    """Read a whole file, or return None if it is larger than `limit` bytes."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size > limit:
+            return None
+        data = f.read(limit + 1)  # bounded even if the file grew meanwhile
+    return data if len(data) <= limit else None
+
 def guess_mime_from_path(path: str) -> Optional[str]:
-    ext = path.lower().rsplit(".", 1)
-    if len(ext) < 2:
-        return None
-    ext = ext[1]
-    if ext in ("jpg", "jpeg"):
-        return "image/jpeg"
-    if ext == "png":
+    i = path.rfind(".")
+    return _EXT_MIME.get(path[i + 1:].lower()) if i >= 0 else None
+
+def sniff_mime(data: bytes) -> Optional[str]:
+    """Identify an allowed attachment type from its leading bytes."""
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
         return "image/png"
-    if ext == "pdf":
+    if data.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    # Readers accept a PDF header anywhere in the first 1 KiB.
+    if data.find(b"%PDF-", 0, 1024) >= 0:
         return "application/pdf"
     return None
 
-def pixmap_from_image_bytes(data: bytes, max_size: QSize) -> Optional[QPixmap]:
-    img = QImage.fromData(data)
+def image_from_image_bytes(data: bytes, max_size: QSize) -> Optional[QImage]:
+    """Decode to a QImage; safe to call off the GUI thread (unlike QPixmap)."""
+    buf = QBuffer()
+    buf.setData(QByteArray(data))
+    buf.open(QIODevice.ReadOnly)
+    reader = QImageReader(buf)
+    reader.setAutoTransform(True)
+    bounded = max_size.width() > 0 and max_size.height() > 0
+    if bounded:
+        # Let the decoder downscale (e.g. JPEG DCT scaling) instead of
+        # materialising the full-resolution image first.
+        src = reader.size()
+        if src.isValid() and (src.width() > max_size.width() or src.height() > max_size.height()):
+            reader.setScaledSize(src.scaled(max_size, Qt.KeepAspectRatio))
+    img = reader.read()
     if img.isNull():
         return None
-    if max_size.width() > 0 and max_size.height() > 0:
+    if bounded and img.size() != img.size().scaled(max_size, Qt.KeepAspectRatio):
+        # EXIF rotation or a small source can still leave it off-target.
         img = img.scaled(max_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-    return QPixmap.fromImage(img)
+    return img
+
+def pixmap_from_image_bytes(data: bytes, max_size: QSize) -> Optional[QPixmap]:
+    img = image_from_image_bytes(data, max_size)
+    return QPixmap.fromImage(img) if img is not None else None
 
 def _pdf_to_png_bytes(data: bytes) -> Optional[bytes]:
     """Convert first page of a PDF to PNG bytes using available backends."""
+    # Backends are imported on first use; only PDF attachments need them.
     try:
+        import pypdfium2 as pdfium
+
         with pdfium.PdfDocument(data) as pdf:
             if len(pdf) < 1:
                 return None
@@ -198,6 +255,8 @@ def _pdf_to_png_bytes(data: bytes) -> Optional[bytes]:
         pass
 
     try:
+        from pdf2image import convert_from_bytes
+
         images = convert_from_bytes(data, first_page=1, last_page=1, fmt="png")
         if images:
             buf = io.BytesIO()
@@ -207,6 +266,8 @@ def _pdf_to_png_bytes(data: bytes) -> Optional[bytes]:
         pass
 
     try:
+        from PIL import Image
+
         with warnings.catch_warnings():
             warnings.simplefilter("ignore")
             img = Image.open(io.BytesIO(data))
@@ -219,9 +280,23 @@ def _pdf_to_png_bytes(data: bytes) -> Optional[bytes]:
 
     return None
 
-def pixmap_from_pdf_bytes(data: bytes, max_size: QSize) -> Optional[QPixmap]:
+def _qt_pdf_document():
+    """Import QtPdf lazily; returns the QPdfDocument class or None."""
+    global PDF_RENDER_AVAILABLE
+    if not PDF_RENDER_AVAILABLE:
+        return None
+    try:
+        from PySide6.QtPdf import QPdfDocument
+    except ImportError:
+        PDF_RENDER_AVAILABLE = False
+        return None
+    return QPdfDocument
+
+def image_from_pdf_bytes(data: bytes, max_size: QSize) -> Optional[QImage]:
+    """Render the first PDF page to a QImage; safe to call off the GUI thread."""
     # Try QtPdf first (fastest when available)
-    if PDF_RENDER_AVAILABLE:
+    QPdfDocument = _qt_pdf_document()
+    if QPdfDocument is not None:
         doc = QPdfDocument()
         buf = QBuffer()
         buf.setData(QByteArray(data))
@@ -233,22 +308,67 @@ def pixmap_from_pdf_bytes(data: bytes, max_size: QSize) -> Optional[QPixmap]:
             ok_value = getattr(QPdfDocument, "NoError", 0)  # older enum style
         if err == ok_value and doc.pageCount() > 0:
             page_size = doc.pagePointSize(0)
-            img = QImage(page_size.toSize(), QImage.Format_ARGB32)
-            img.fill(Qt.white)
-            painter = QPainter(img)
-            doc.render(painter, 0, QRectF(QPointF(0, 0), QSizeF(page_size)))
-            painter.end()
-            if max_size.width() > 0 and max_size.height() > 0:
-                img = img.scaled(max_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            return QPixmap.fromImage(img)
+            target = page_size.toSize()
+            if max_size.width() > 0 and max_size.height() > 0 and not page_size.isEmpty():
+                # Rasterise straight at thumbnail size instead of page size + rescale.
+                scale = min(max_size.width() / page_size.width(), max_size.height() / page_size.height())
+                target = QSize(max(1, int(page_size.width() * scale)), max(1, int(page_size.height() * scale)))
+            img = doc.render(0, target)
+            if not img.isNull():
+                return img
 
     # Fallback: convert to PNG via external libs
     png_bytes = _pdf_to_png_bytes(data)
     if png_bytes:
-        return pixmap_from_image_bytes(png_bytes, max_size)
+        return image_from_image_bytes(png_bytes, max_size)
     return None
 
 
+class _PreviewSignals(QObject):
+    finished = Signal(int, QImage)
+
+
+class PreviewTask(QRunnable):
+    """Decodes an attachment preview on a worker thread.
+
+    The result is emitted as a QImage (QPixmap may only be built on the GUI
+    thread) together with the caller's token, so stale results can be dropped.
+    """
+
+    _pool: Optional[QThreadPool] = None
+
+    def __init__(self, token: int, data: bytes, mime: str, max_size: QSize, signals: _PreviewSignals):
+        super().__init__()
+        self.token = token
+        self.data = data
+        self.mime = mime
+        self.max_size = QSize(max_size)
+        self.signals = signals
+
+    @classmethod
+    def pool(cls) -> QThreadPool:
+        # One worker: the PDF backends are not safe to run concurrently, and
+        # only the latest preview matters anyway.
+        if cls._pool is None:
+            cls._pool = QThreadPool()
+            cls._pool.setMaxThreadCount(1)
+        return cls._pool
+
+    def run(self):
+        img: Optional[QImage] = None
+        try:
+            if self.mime in ("image/jpeg", "image/png"):
+                img = image_from_image_bytes(self.data, self.max_size)
+            elif self.mime == "application/pdf":
+                img = image_from_pdf_bytes(self.data, self.max_size)
+        except Exception:
+            img = None
+        try:
+            self.signals.finished.emit(self.token, img if img is not None else QImage())
+        except RuntimeError:
+            pass  # receiver already destroyed
+
+
 # -------------------------
 # Database / Repository
 # -------------------------
@@ -289,6 +409,7 @@ CREATE TABLE IF NOT EXISTS gl_entry_item (
   currency_original TEXT NOT NULL,
   amount_original   NUMERIC,
   item_text         TEXT,
+  accounting_date   TEXT,  -- copy of gl_entry.accounting_date, see _migrate_item_accounting_date
   PRIMARY KEY (entry_uuid, line_no),
   FOREIGN KEY (entry_uuid) REFERENCES gl_entry(entry_uuid) ON DELETE CASCADE,
   FOREIGN KEY (account_code) REFERENCES gl_account(account_code),
@@ -308,6 +429,9 @@ CREATE TABLE IF NOT EXISTS user_setting (
   setting_key   TEXT PRIMARY KEY NOT NULL,
   setting_value TEXT NOT NULL
 );
+
+CREATE INDEX IF NOT EXISTS ix_account_type_active ON gl_account(account_type, is_active, account_code);
+CREATE INDEX IF NOT EXISTS ix_ei_acct_dc ON gl_entry_item(account_code, dc, amount_domestic);
 """
 
 MASTER_ACCOUNTS = [
@@ -333,157 +457,257 @@ DEFAULT_SETTINGS = [
     ("CURRENCY_DOMESTIC", "GBP"),
 ]
 
+# Hot statements are kept as constants so the connection's statement cache
+# (keyed by SQL text) keeps them prepared across calls.
+SQL_GET_DOMESTIC_CURRENCY = "SELECT setting_value FROM user_setting WHERE setting_key='CURRENCY_DOMESTIC'"
+SQL_GET_ENTRY_WITH_ITEMS = """SELECT h.entry_uuid, h.modification_date, h.accounting_date, h.entry_type,
+                          h.entry_title, h.entry_text,
+                          ei.line_no, ei.account_code, ei.dc, ei.amount_domestic,
+                          ei.currency_original, ei.amount_original, ei.item_text,
+                          a.account_name, a.account_type, a.is_pl
+                   FROM gl_entry h
+                   LEFT JOIN gl_entry_item ei ON ei.entry_uuid=h.entry_uuid
+                   LEFT JOIN gl_account a ON a.account_code=ei.account_code
+                   WHERE h.entry_uuid=?
+                   ORDER BY ei.line_no"""
+SQL_INSERT_ENTRY = """INSERT INTO gl_entry(entry_uuid, modification_date, accounting_date, entry_type, entry_title, entry_text)
+                   VALUES(?,?,?,?,?,?)"""
+SQL_UPSERT_ENTRY = """INSERT INTO gl_entry(entry_uuid, modification_date, accounting_date, entry_type, entry_title, entry_text)
+                   VALUES(?,?,?,?,?,?)
+                   ON CONFLICT(entry_uuid) DO UPDATE SET
+                     modification_date=excluded.modification_date,
+                     accounting_date=excluded.accounting_date,
+                     entry_type=excluded.entry_type,
+                     entry_title=excluded.entry_title,
+                     entry_text=excluded.entry_text"""
+SQL_TRIM_ENTRY_ITEMS = "DELETE FROM gl_entry_item WHERE entry_uuid=? AND line_no > ?"
+SQL_INSERT_ENTRY_ITEM = """INSERT INTO gl_entry_item(entry_uuid,line_no,account_code,dc,amount_domestic,currency_original,amount_original,item_text,accounting_date)
+                   VALUES(?,?,?,?,?,?,?,?,?)"""
+SQL_REPLACE_ENTRY_ITEM = """INSERT OR REPLACE INTO gl_entry_item(entry_uuid,line_no,account_code,dc,amount_domestic,currency_original,amount_original,item_text,accounting_date)
+                   VALUES(?,?,?,?,?,?,?,?,?)"""
+SQL_UPSERT_ATTACHMENT = """INSERT INTO gl_entry_attachment(entry_uuid, file_name, mime_type, file_blob)
+               VALUES(?,?,?,?)
+               ON CONFLICT(entry_uuid) DO UPDATE SET
+                 file_name=excluded.file_name,
+                 mime_type=excluded.mime_type,
+                 file_blob=excluded.file_blob"""
+
 class Repo:
     def __init__(self, db_path: str):
         self.db_path = db_path
-        self.conn = sqlite3.connect(self.db_path)
+        # Autocommit: single statements commit on their own and multi-statement
+        # writes open an explicit transaction via _transaction().
+        self.conn = sqlite3.connect(self.db_path, cached_statements=256, isolation_level=None)
         self.conn.row_factory = sqlite3.Row
         self.conn.execute("PRAGMA foreign_keys = ON;")
+        if self.db_path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode = WAL;")
+        self.conn.execute("PRAGMA synchronous = NORMAL;")
+        self.conn.execute("PRAGMA cache_size = -16000;")  # ~16MB
+        self.conn.execute("PRAGMA mmap_size = 268435456;")  # 256MB
+        self.conn.execute("PRAGMA temp_store = MEMORY;")
+        self.conn.execute("PRAGMA journal_size_limit = 67108864;")
+        self.conn.execute("PRAGMA trusted_schema = OFF;")
+        self._dom_ccy: Optional[str] = None
+        self._account_cache: Dict[Tuple[str, Tuple[Any, ...]], List[sqlite3.Row]] = {}
+        self._accounts_snapshot: Optional[List[sqlite3.Row]] = None
+        self.accounts_version = 0  # bumped whenever gl_account may have changed
+        self._write_gen = 0  # bumped whenever entries or accounts may have changed
+        self._bs_cache: Optional[Tuple[int, List[sqlite3.Row]]] = None
+
+    def invalidate_domestic_currency(self):
+        """Forget the cached CURRENCY_DOMESTIC; call after changing that setting."""
+        self._dom_ccy = None
+
+    def _invalidate_account_cache(self):
+        self._account_cache.clear()
+        self._accounts_snapshot = None
+        self.accounts_version += 1
+        self._write_gen += 1
+
+    def _entries_changed(self):
+        self._write_gen += 1
+
+    def _all_accounts(self) -> List[sqlite3.Row]:
+        if self._accounts_snapshot is None:
+            self._accounts_snapshot = self.conn.execute(
+                """SELECT account_code, account_name, account_type, is_pl, is_active, is_user_managed
+                       FROM gl_account
+                   ORDER BY account_code"""
+            ).fetchall()
+        return self._accounts_snapshot
+
+    @contextmanager
+    def _transaction(self):
+        self.conn.execute("BEGIN")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
 
     def close(self):
-        self.conn.close()
+        try:
+            self.conn.execute("PRAGMA optimize;")
+        finally:
+            self.conn.close()
 
     def init_db(self):
         self.conn.executescript(SCHEMA_SQL)
-        for row in MASTER_ACCOUNTS:
-            self.conn.execute(
+        with self._transaction():
+            self._migrate_account_code_int()
+            self._migrate_item_accounting_date()
+            self.conn.executemany(
                 """INSERT OR IGNORE INTO gl_account
                    (account_code, account_name, account_type, is_pl, is_active, is_user_managed)
                    VALUES (?, ?, ?, ?, ?, ?)
                 """,
-                row,
+                MASTER_ACCOUNTS,
             )
-        for k, v in DEFAULT_SETTINGS:
-            self.conn.execute(
+            self.conn.executemany(
                 "INSERT OR IGNORE INTO user_setting(setting_key, setting_value) VALUES (?,?)",
-                (k, v),
+                DEFAULT_SETTINGS,
             )
-        self.conn.commit()
-
-    def seed_sample_data_if_empty(self):
-        c = self.conn.execute("SELECT COUNT(*) AS n FROM gl_entry").fetchone()["n"]
-        if c > 0:
-            return
-
-        dom = self.get_domestic_currency()
-
-        # Expense entry 1
-        e1 = new_uuid()
+        self.invalidate_domestic_currency()
+        self._invalidate_account_cache()
+        # Analyse tables that need it so the planner has stats from the start.
+        self.conn.execute("PRAGMA optimize = 0x10002;")
+
+    def _migrate_account_code_int(self):
+        # Integer view of account_code for range scans. VIRTUAL because
+        # ALTER TABLE cannot add STORED generated columns to existing DBs.
+        cols = {r["name"] for r in self.conn.execute("PRAGMA table_xinfo(gl_account)")}
+        if "account_code_int" not in cols:
+            self.conn.execute(
+                "ALTER TABLE gl_account ADD COLUMN account_code_int INTEGER "
+                "GENERATED ALWAYS AS (CAST(account_code AS INTEGER)) VIRTUAL"
+            )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS ix_account_code_int ON gl_account(account_code_int)")
+
+    def _migrate_item_accounting_date(self):
+        # Lines carry their entry's accounting_date so date-ordered journal
+        # and trend queries can scan gl_entry_item without joining gl_entry.
+        # save_entry_full_replace rewrites every line of an entry, so the copy
+        # never drifts from the header.
+        cols = {r["name"] for r in self.conn.execute("PRAGMA table_info(gl_entry_item)")}
+        if "accounting_date" not in cols:
+            self.conn.execute("ALTER TABLE gl_entry_item ADD COLUMN accounting_date TEXT")
         self.conn.execute(
-            """INSERT INTO gl_entry(entry_uuid, modification_date, accounting_date, entry_type, entry_title, entry_text)
-               VALUES (?,?,?,?,?,?)
-            """,
-            (e1, now_iso(), (dt.date.today() - dt.timedelta(days=2)).isoformat(), "EXPENSE", "Tesco", "Groceries"),
+            """UPDATE gl_entry_item
+                  SET accounting_date = (SELECT e.accounting_date FROM gl_entry e WHERE e.entry_uuid = gl_entry_item.entry_uuid)
+                WHERE accounting_date IS NULL"""
         )
-        self.conn.executemany(
-            """INSERT INTO gl_entry_item(entry_uuid,line_no,account_code,dc,amount_domestic,currency_original,amount_original,item_text)
-               VALUES (?,?,?,?,?,?,?,?)
-            """,
-            [
-                (e1, 1, "5000000001", "D", 18.50, dom, 18.50, None),
-                (e1, 2, "5000000007", "D", 6.20, dom, 6.20, None),
-                (e1, 3, "0000000001", "C", 24.70, dom, 24.70, None),
-            ],
-        )
-
-        # Expense entry 2 (foreign currency)
-        e2 = new_uuid()
         self.conn.execute(
-            """INSERT INTO gl_entry(entry_uuid, modification_date, accounting_date, entry_type, entry_title, entry_text)
-               VALUES (?,?,?,?,?,?)
-            """,
-            (e2, now_iso(), (dt.date.today() - dt.timedelta(days=1)).isoformat(), "EXPENSE", "Amazon US", "Foreign purchase"),
+            "CREATE INDEX IF NOT EXISTS ix_ei_date ON gl_entry_item(accounting_date DESC, entry_uuid DESC, line_no)"
         )
-        self.conn.executemany(
-            """INSERT INTO gl_entry_item(entry_uuid,line_no,account_code,dc,amount_domestic,currency_original,amount_original,item_text)
-               VALUES (?,?,?,?,?,?,?,?)
-            """,
-            [
-                (e2, 1, "5000000002", "D", 30.00, "USD", 38.00, None),
-                (e2, 2, "0000000001", "C", 30.00, "USD", 38.00, None),
-            ],
-        )
-
-        # General entry (pay credit card with cash)
-        e3 = new_uuid()
+        # Account drill-down: a range read in journal order for one account.
         self.conn.execute(
-            """INSERT INTO gl_entry(entry_uuid, modification_date, accounting_date, entry_type, entry_title, entry_text)
-               VALUES (?,?,?,?,?,?)
-            """,
-            (e3, now_iso(), dt.date.today().isoformat(), "GENERAL", "Card Payment", "Pay credit card"),
-        )
-        self.conn.executemany(
-            """INSERT INTO gl_entry_item(entry_uuid,line_no,account_code,dc,amount_domestic,currency_original,amount_original,item_text)
-               VALUES (?,?,?,?,?,?,?,?)
-            """,
-            [
-                (e3, 1, "1000000001", "D", 50.00, dom, 50.00, "Credit card decrease"),
-                (e3, 2, "0000000001", "C", 50.00, dom, 50.00, "Cash decrease"),
-            ],
+            "CREATE INDEX IF NOT EXISTS ix_ei_account_date "
+            "ON gl_entry_item(account_code, accounting_date DESC, entry_uuid DESC, line_no)"
         )
 
-        self.conn.commit()
+    def seed_sample_data_if_empty(self):
+        c = self.conn.execute("SELECT COUNT(*) AS n FROM gl_entry").fetchone()["n"]
+        if c > 0:
+            return
+
+        dom = self.get_domestic_currency()
+        today = dt.date.today()
+        e1, e2, e3 = new_uuid(), new_uuid(), new_uuid()
+        d1 = (today - dt.timedelta(days=2)).isoformat()
+        d2 = (today - dt.timedelta(days=1)).isoformat()
+        d3 = today.isoformat()
+        headers = [
+            # Expense entry 1
+            (e1, now_iso(), d1, "EXPENSE", "Tesco", "Groceries"),
+            # Expense entry 2 (foreign currency)
+            (e2, now_iso(), d2, "EXPENSE", "Amazon US", "Foreign purchase"),
+            # General entry (pay credit card with cash)
+            (e3, now_iso(), d3, "GENERAL", "Card Payment", "Pay credit card"),
+        ]
+        items = [
+            (e1, 1, "5000000001", "D", 18.50, dom, 18.50, None, d1),
+            (e1, 2, "5000000007", "D", 6.20, dom, 6.20, None, d1),
+            (e1, 3, "0000000001", "C", 24.70, dom, 24.70, None, d1),
+            (e2, 1, "5000000002", "D", 30.00, "USD", 38.00, None, d2),
+            (e2, 2, "0000000001", "C", 30.00, "USD", 38.00, None, d2),
+            (e3, 1, "1000000001", "D", 50.00, dom, 50.00, "Credit card decrease", d3),
+            (e3, 2, "0000000001", "C", 50.00, dom, 50.00, "Cash decrease", d3),
+        ]
+        with self._transaction():
+            self.conn.executemany(SQL_INSERT_ENTRY, headers)
+            self.conn.executemany(SQL_INSERT_ENTRY_ITEM, items)
+        self._entries_changed()
+        self.conn.execute("ANALYZE;")
 
     def get_domestic_currency(self) -> str:
-        row = self.conn.execute(
-            "SELECT setting_value FROM user_setting WHERE setting_key='CURRENCY_DOMESTIC'"
-        ).fetchone()
-        return row["setting_value"] if row else "GBP"
+        if self._dom_ccy is None:
+            row = self.conn.execute(SQL_GET_DOMESTIC_CURRENCY).fetchone()
+            self._dom_ccy = row["setting_value"] if row else "GBP"
+        return self._dom_ccy
 
     # --- Attachments
-    def get_attachment(self, entry_uuid: str) -> Optional[sqlite3.Row]:
+    def get_attachment_meta(self, entry_uuid: str) -> Optional[sqlite3.Row]:
+        """Return file_name/mime_type/size (and rowid) without copying the blob."""
         return self.conn.execute(
-            "SELECT entry_uuid, file_name, mime_type, file_blob FROM gl_entry_attachment WHERE entry_uuid=?",
+            """SELECT rowid, entry_uuid, file_name, mime_type, length(file_blob) AS size
+                   FROM gl_entry_attachment
+                  WHERE entry_uuid=?""",
             (entry_uuid,),
         ).fetchone()
 
+    def read_attachment_blob(self, meta: sqlite3.Row) -> bytes:
+        """Read the blob for a row returned by get_attachment_meta."""
+        if hasattr(self.conn, "blobopen"):
+            with self.conn.blobopen("gl_entry_attachment", "file_blob", meta["rowid"], readonly=True) as blob:
+                return blob.read()
+        row = self.conn.execute(
+            "SELECT file_blob FROM gl_entry_attachment WHERE rowid=?", (meta["rowid"],)
+        ).fetchone()
+        return bytes(row["file_blob"]) if row else b""
+
     def upsert_attachment(self, entry_uuid: str, file_name: Optional[str], mime_type: str, blob: bytes):
         self.conn.execute(
-            """INSERT INTO gl_entry_attachment(entry_uuid, file_name, mime_type, file_blob)
-               VALUES(?,?,?,?)
-               ON CONFLICT(entry_uuid) DO UPDATE SET
-                 file_name=excluded.file_name,
-                 mime_type=excluded.mime_type,
-                 file_blob=excluded.file_blob""",
+            SQL_UPSERT_ATTACHMENT,
             (entry_uuid, file_name, mime_type, sqlite3.Binary(blob)),
         )
-        self.conn.commit()
 
     def delete_attachment(self, entry_uuid: str):
         self.conn.execute("DELETE FROM gl_entry_attachment WHERE entry_uuid=?", (entry_uuid,))
-        self.conn.commit()
 
     # --- Account master queries
     def list_accounts(self, where_sql: str = "", params: Tuple[Any, ...] = ()) -> List[sqlite3.Row]:
-        sql = """SELECT account_code, account_name, account_type, is_pl, is_active, is_user_managed
-                 FROM gl_account WHERE 1=1 """
-        if where_sql:
-            sql += " AND " + where_sql
-        sql += " ORDER BY account_code"
-        return list(self.conn.execute(sql, params).fetchall())
+        key = (where_sql, tuple(params))
+        rows = self._account_cache.get(key)
+        if rows is None:
+            sql = """SELECT account_code, account_name, account_type, is_pl, is_active, is_user_managed
+                     FROM gl_account WHERE 1=1 """
+            if where_sql:
+                sql += " AND " + where_sql
+            sql += " ORDER BY account_code"
+            rows = self.conn.execute(sql, params).fetchall()
+            self._account_cache[key] = rows
+        return list(rows)
 
     def list_expense_categories(self) -> List[sqlite3.Row]:
-        return self.list_accounts("is_active=1 AND account_type='EXPENSE'")
+        return [r for r in self._all_accounts() if r["is_active"] == 1 and r["account_type"] == "EXPENSE"]
 
     def list_asset_accounts(self) -> List[sqlite3.Row]:
-        return self.list_accounts("is_active=1 AND account_type='ASSET'")
+        return [r for r in self._all_accounts() if r["is_active"] == 1 and r["account_type"] == "ASSET"]
 
     def list_payment_accounts(self) -> List[sqlite3.Row]:
         """Payment accounts can be ASSET (cash/bank) or LIAB (credit card)."""
-        return self.list_accounts("is_active=1 AND account_type IN ('ASSET','LIAB')")
+        return [r for r in self._all_accounts() if r["is_active"] == 1 and r["account_type"] in ("ASSET", "LIAB")]
 
     def list_user_managed_bs_accounts(self) -> List[sqlite3.Row]:
-        return list(
-            self.conn.execute(
-                """SELECT account_code, account_name, account_type, is_active
-                       FROM gl_account
-                      WHERE is_user_managed=1
-                        AND account_type IN ('ASSET','LIAB')
-                   ORDER BY
-                     CASE WHEN is_active=0 THEN 3 WHEN account_type='ASSET' THEN 1 ELSE 2 END,
-                     account_name"""
-            ).fetchall()
-        )
+        rows = [
+            r for r in self._all_accounts()
+            if r["is_user_managed"] == 1 and r["account_type"] in ("ASSET", "LIAB")
+        ]
+        # Active assets, then active liabilities, then inactive; by name within each.
+        rows.sort(key=lambda r: (3 if r["is_active"] == 0 else 1 if r["account_type"] == "ASSET" else 2, r["account_name"]))
+        return rows
 
     def find_account_by_name(
         self,
@@ -519,21 +743,21 @@ class Repo:
 
     def next_user_managed_code(self, account_type: str) -> str:
         if account_type == "ASSET":
-            pattern = "1?????????"
             base_floor = 1000000000
         elif account_type == "LIAB":
-            pattern = "2?????????"
             base_floor = 2000000000
         else:
             raise ValueError("account_type must be ASSET or LIAB")
 
         # Use prefix-based scan (no account_type filter) to avoid collisions
-        # when legacy data has incorrect type/code combinations.
+        # when legacy data has incorrect type/code combinations. Codes are
+        # always 10 digits (CHECK constraint), so the integer range covers
+        # exactly the codes with that leading digit.
         row = self.conn.execute(
-            """SELECT printf('%010d', COALESCE(MAX(CAST(account_code AS INTEGER)), ?) + 1) AS next_code
+            """SELECT printf('%010d', COALESCE(MAX(account_code_int), ?) + 1) AS next_code
                    FROM gl_account
-                  WHERE account_code GLOB ?""",
-            (base_floor, pattern),
+                  WHERE account_code_int BETWEEN ? AND ?""",
+            (base_floor, base_floor, base_floor + 999999999),
         ).fetchone()
         return row["next_code"]
 
@@ -546,7 +770,7 @@ class Repo:
                    VALUES(?, ?, ?, 0, ?, 1)""",
             (code, account_name, account_type, is_active),
         )
-        self.conn.commit()
+        self._invalidate_account_cache()
         return code
 
     def update_user_managed_account(self, account_code: str, account_name: str, is_active: int):
@@ -560,7 +784,7 @@ class Repo:
         )
         if cur.rowcount == 0:
             raise ValueError("Account not found or not user managed")
-        self.conn.commit()
+        self._invalidate_account_cache()
 
     def get_user_managed_account(self, account_code: str) -> Optional[sqlite3.Row]:
         return self.conn.execute(
@@ -573,25 +797,17 @@ class Repo:
         ).fetchone()
 
     # --- Entry queries
-    def get_entry_header(self, entry_uuid: str) -> Optional[sqlite3.Row]:
-        return self.conn.execute("SELECT * FROM gl_entry WHERE entry_uuid=?", (entry_uuid,)).fetchone()
-
-    def get_entry_items(self, entry_uuid: str) -> List[sqlite3.Row]:
-        return list(
-            self.conn.execute(
-                """SELECT ei.*, a.account_name, a.account_type, a.is_pl
-                   FROM gl_entry_item ei
-                   JOIN gl_account a ON a.account_code=ei.account_code
-                   WHERE ei.entry_uuid=?
-                   ORDER BY ei.line_no""",
-                (entry_uuid,),
-            ).fetchall()
-        )
+    def get_entry_with_items(self, entry_uuid: str) -> Tuple[Optional[sqlite3.Row], List[sqlite3.Row]]:
+        """Header and items in one query; each item row also carries the header columns."""
+        rows = self.conn.execute(SQL_GET_ENTRY_WITH_ITEMS, (entry_uuid,)).fetchall()
+        if not rows:
+            return None, []
+        return rows[0], [r for r in rows if r["line_no"] is not None]
 
     def delete_entry(self, entry_uuid: str):
-        self.conn.execute("DELETE FROM gl_entry_item WHERE entry_uuid=?", (entry_uuid,))
+        # Items and attachment go via ON DELETE CASCADE (foreign_keys=ON).
         self.conn.execute("DELETE FROM gl_entry WHERE entry_uuid=?", (entry_uuid,))
-        self.conn.commit()
+        self._entries_changed()
 
     def save_entry_full_replace(
         self,
@@ -608,67 +824,74 @@ class Repo:
         if not items:
             raise ValueError("At least one item is required")
 
+        codes = list({it["account_code"] for it in items})
+        active_by_code = dict(
+            self.conn.execute(
+                f"SELECT account_code, is_active FROM gl_account WHERE account_code IN ({','.join('?' * len(codes))})",
+                codes,
+            ).fetchall()
+        )
         for it in items:
             ac = it["account_code"]
-            row = self.conn.execute("SELECT is_active FROM gl_account WHERE account_code=?", (ac,)).fetchone()
-            if row is None:
+            is_active = active_by_code.get(ac)
+            if is_active is None:
                 raise ValueError(f"Unknown account_code: {ac}")
-            if row["is_active"] != 1:
+            if is_active != 1:
                 raise ValueError(f"Inactive account_code: {ac}")
             if it["dc"] not in ("D", "C"):
                 raise ValueError("dc must be D or C")
 
-        bal = 0.0
-        for it in items:
-            amt = float(it["amount_domestic"])
-            bal += amt if it["dc"] == "D" else -amt
+        bal = math.fsum(
+            float(it["amount_domestic"]) if it["dc"] == "D" else -float(it["amount_domestic"])
+            for it in items
+        )
         if abs(bal) > 1e-6:
             raise ValueError(f"Debit/Credit not balanced (domestic). diff={bal:.6f}")
 
         mod_date = now_iso()
 
-        if is_new:
-            self.conn.execute(
-                """INSERT INTO gl_entry(entry_uuid, modification_date, accounting_date, entry_type, entry_title, entry_text)
-                   VALUES(?,?,?,?,?,?)""",
-                (entry_uuid, mod_date, accounting_date, entry_type, entry_title, entry_text),
-            )
-        else:
-            self.conn.execute(
-                """UPDATE gl_entry
-                   SET modification_date=?, accounting_date=?, entry_type=?, entry_title=?, entry_text=?
-                   WHERE entry_uuid=?""",
-                (mod_date, accounting_date, entry_type, entry_title, entry_text, entry_uuid),
+        header = (entry_uuid, mod_date, accounting_date, entry_type, entry_title, entry_text)
+        lines = [
+            (
+                entry_uuid,
+                idx,
+                it["account_code"],
+                it["dc"],
+                it["amount_domestic"],
+                it["currency_original"],
+                it.get("amount_original"),
+                it.get("item_text"),
+                accounting_date,
             )
+            for idx, it in enumerate(items, start=1)
+        ]
 
-        self.conn.execute("DELETE FROM gl_entry_item WHERE entry_uuid=?", (entry_uuid,))
-        for idx, it in enumerate(items, start=1):
-            self.conn.execute(
-                """INSERT INTO gl_entry_item(entry_uuid,line_no,account_code,dc,amount_domestic,currency_original,amount_original,item_text)
-                   VALUES(?,?,?,?,?,?,?,?)""",
-                (
-                    entry_uuid,
-                    idx,
-                    it["account_code"],
-                    it["dc"],
-                    it["amount_domestic"],
-                    it["currency_original"],
-                    it.get("amount_original"),
-                    it.get("item_text"),
-                ),
-            )
-        self.conn.commit()
+        with self._transaction():
+            if is_new:
+                # Plain INSERTs: a clashing uuid raises IntegrityError instead
+                # of overwriting another entry.
+                self.conn.execute(SQL_INSERT_ENTRY, header)
+                self.conn.executemany(SQL_INSERT_ENTRY_ITEM, lines)
+            else:
+                # DO UPDATE keeps the existing row, so items and attachment are
+                # not touched by ON DELETE CASCADE the way INSERT OR REPLACE would.
+                self.conn.execute(SQL_UPSERT_ENTRY, header)
+                # Lines are overwritten in place by (entry_uuid, line_no); any
+                # surplus lines from a longer previous version are trimmed.
+                self.conn.executemany(SQL_REPLACE_ENTRY_ITEM, lines)
+                self.conn.execute(SQL_TRIM_ENTRY_ITEMS, (entry_uuid, len(items)))
+        self._entries_changed()
 
     # --- List queries for UI
-    def list_journal_items_base(
+    def _journal_items_query(
         self,
         account_code: Optional[str] = None,
         account_type: Optional[str] = None,
-    ) -> List[sqlite3.Row]:
+    ) -> Tuple[str, List[Any]]:
         sql = """
         SELECT
-          e.accounting_date,
-          e.entry_uuid,
+          ei.accounting_date,
+          ei.entry_uuid,
           e.entry_title,
           ei.account_code,
           a.account_type,
@@ -687,16 +910,29 @@ class Repo:
             sql += " AND a.account_type = ?"
             params.append(account_type)
 
-        sql += " ORDER BY e.accounting_date DESC, e.entry_uuid DESC, ei.line_no ASC"
-        return list(self.conn.execute(sql, params).fetchall())
-
-    def list_expense_list(self) -> List[sqlite3.Row]:
-        return self.list_journal_items_base(account_type="EXPENSE")
+        sql += " ORDER BY ei.accounting_date DESC, ei.entry_uuid DESC, ei.line_no ASC"
+        return sql, params
 
-    def list_account_transactions(self, account_code: str) -> List[sqlite3.Row]:
-        return self.list_journal_items_base(account_code=account_code)
+    def list_journal_items_soa(
+        self,
+        account_code: Optional[str] = None,
+        account_type: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Journal lines in display order, as one sequence per column."""
+        sql, params = self._journal_items_query(account_code, account_type)
+        cur = self.conn.cursor()
+        cur.row_factory = None
+        rows = cur.execute(sql, params).fetchall()
+        names = [c[0] for c in cur.description]
+        cols = dict(zip(names, zip(*rows))) if rows else {n: () for n in names}
+        cols["amount_domestic"] = array("d", map(float, cols["amount_domestic"]))
+        return cols
 
     def list_balance_sheet_overview(self) -> List[sqlite3.Row]:
+        # Reused until the next entry/account write bumps _write_gen.
+        cached = self._bs_cache
+        if cached is not None and cached[0] == self._write_gen:
+            return cached[1]
         sql = """
         SELECT
           a.account_type,
@@ -705,7 +941,6 @@ class Repo:
           COALESCE(SUM(CASE WHEN ei.dc='D' THEN ei.amount_domestic ELSE -ei.amount_domestic END), 0) AS balance_domestic
         FROM gl_account a
         LEFT JOIN gl_entry_item ei ON ei.account_code = a.account_code
-        LEFT JOIN gl_entry e ON e.entry_uuid = ei.entry_uuid
         WHERE a.is_active=1
           AND a.account_type IN ('ASSET','LIAB')
         GROUP BY a.account_type, a.account_code, a.account_name
@@ -713,7 +948,9 @@ class Repo:
           CASE a.account_type WHEN 'ASSET' THEN 1 WHEN 'LIAB' THEN 2 ELSE 9 END,
           a.account_code
         """
-        return list(self.conn.execute(sql).fetchall())
+        rows = self.conn.execute(sql).fetchall()
+        self._bs_cache = (self._write_gen, rows)
+        return rows
 
     def list_expense_trend(
         self,
@@ -721,7 +958,7 @@ class Repo:
         date_from: Optional[str] = None,
         date_to: Optional[str] = None,
     ) -> List[sqlite3.Row]:
-        label_expr = "e.accounting_date" if granularity == "day" else "substr(e.accounting_date,1,7)"
+        label_expr = "ei.accounting_date" if granularity == "day" else "substr(ei.accounting_date,1,7)"
         sql = f"""
         SELECT
           {label_expr} AS label,
@@ -729,17 +966,16 @@ class Repo:
           a.account_name,
           SUM(CASE WHEN ei.dc='D' THEN ei.amount_domestic ELSE -ei.amount_domestic END) AS amount_domestic_sum
         FROM gl_entry_item ei
-        JOIN gl_entry e   ON e.entry_uuid = ei.entry_uuid
         JOIN gl_account a ON a.account_code = ei.account_code
         WHERE a.is_active=1
           AND a.account_type='EXPENSE'
         """
         params: List[Any] = []
         if date_from:
-            sql += " AND e.accounting_date >= ?"
+            sql += " AND ei.accounting_date >= ?"
             params.append(date_from)
         if date_to:
-            sql += " AND e.accounting_date <= ?"
+            sql += " AND ei.accounting_date <= ?"
             params.append(date_to)
         sql += " GROUP BY label, ei.account_code, a.account_name ORDER BY label ASC, ei.account_code ASC"
         return list(self.conn.execute(sql, params).fetchall())
@@ -752,11 +988,10 @@ class Repo:
           a.account_type,
           SUM(CASE WHEN ei.dc='D' THEN ei.amount_domestic ELSE -ei.amount_domestic END) AS delta_amount
         FROM gl_entry_item ei
-        JOIN gl_entry e   ON e.entry_uuid = ei.entry_uuid
         JOIN gl_account a ON a.account_code = ei.account_code
         WHERE a.is_active=1
           AND a.account_type IN ('ASSET','LIAB')
-          AND e.accounting_date < ?
+          AND ei.accounting_date < ?
         GROUP BY a.account_type
         """
         asset_open = 0.0
@@ -774,24 +1009,23 @@ class Repo:
         date_from: Optional[str] = None,
         date_to: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
-        label_expr = "e.accounting_date" if granularity == "day" else "substr(e.accounting_date,1,7)"
+        label_expr = "ei.accounting_date" if granularity == "day" else "substr(ei.accounting_date,1,7)"
         sql = f"""
         SELECT
           {label_expr} AS label,
           a.account_type,
           SUM(CASE WHEN ei.dc='D' THEN ei.amount_domestic ELSE -ei.amount_domestic END) AS delta_amount
         FROM gl_entry_item ei
-        JOIN gl_entry e   ON e.entry_uuid = ei.entry_uuid
         JOIN gl_account a ON a.account_code = ei.account_code
         WHERE a.is_active=1
           AND a.account_type IN ('ASSET','LIAB')
         """
         params: List[Any] = []
         if date_from:
-            sql += " AND e.accounting_date >= ?"
+            sql += " AND ei.accounting_date >= ?"
             params.append(date_from)
         if date_to:
-            sql += " AND e.accounting_date <= ?"
+            sql += " AND ei.accounting_date <= ?"
             params.append(date_to)
         sql += " GROUP BY label, a.account_type ORDER BY label ASC, a.account_type ASC"
         rows = list(self.conn.execute(sql, params).fetchall())
@@ -843,6 +1077,11 @@ class JsonExpenseImportResult:
     line_count: int
 
 
+_ISO_DATE_RE = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}\Z")
+_CCY_RE = re.compile(r"[A-Z]{3}\Z").match
+_LINE_FIELDS = itemgetter("account_code", "amount_domestic", "amount_original", "item_text")
+
+
 class JsonExpenseImportService:
     """Reusable core for importing expense entries from JSON (LLM/API)."""
 
@@ -859,9 +1098,13 @@ class JsonExpenseImportService:
         return self.import_payload(payload)
 
     def import_payload(self, payload: Any) -> JsonExpenseImportResult:
-        data = self._normalize_top(payload)
+        # Name lookups are resolved from these per-import maps; a miss still
+        # falls back to the repo query.
+        pay_by_name = {r["account_name"].lower(): r for r in self.repo.list_payment_accounts()}
+        cat_by_name = {r["account_name"].lower(): r for r in self.repo.list_expense_categories()}
+        data = self._normalize_top(payload, pay_by_name)
         norm_lines = [
-            self._normalize_line(idx, line, data["currency_original"])
+            self._normalize_line(idx, line, data["currency_original"], cat_by_name)
             for idx, line in enumerate(data["lines"], start=1)
         ]
         items, total_dom, total_org = self._build_items(data, norm_lines)
@@ -888,7 +1131,11 @@ class JsonExpenseImportService:
         )
 
     # Normalization / validation helpers
-    def _normalize_top(self, payload: Any) -> Dict[str, Any]:
+    def _normalize_top(
+        self,
+        payload: Any,
+        pay_by_name: Optional[Dict[str, sqlite3.Row]] = None,
+    ) -> Dict[str, Any]:
         if not isinstance(payload, dict):
             raise JsonExpenseImportError("Top-level JSON must be an object.")
 
@@ -929,7 +1176,8 @@ class JsonExpenseImportService:
         pay_name = payload.get("payment_account")
         if not isinstance(pay_name, str) or not pay_name.strip():
             raise JsonExpenseImportError("payment_account must be a non-empty string.")
-        pay_row = self.repo.find_payment_account_by_name(pay_name.strip())
+        pay_name = pay_name.strip()
+        pay_row = (pay_by_name or {}).get(pay_name.lower()) or self.repo.find_payment_account_by_name(pay_name)
         if not pay_row:
             raise JsonExpenseImportError(f"payment_account not found/active ASSET or LIAB account: {pay_name}")
 
@@ -959,7 +1207,13 @@ class JsonExpenseImportService:
             "lines": lines,
         }
 
-    def _normalize_line(self, idx: int, line: Any, currency: str) -> Dict[str, Any]:
+    def _normalize_line(
+        self,
+        idx: int,
+        line: Any,
+        currency: str,
+        cat_by_name: Optional[Dict[str, sqlite3.Row]] = None,
+    ) -> Dict[str, Any]:
         if not isinstance(line, dict):
             raise JsonExpenseImportError(f"lines[{idx}] must be an object.")
         allowed_keys = {"expense_category", "note", "amount_domestic", "amount_original"}
@@ -970,7 +1224,10 @@ class JsonExpenseImportService:
         cat_name = line.get("expense_category")
         if not isinstance(cat_name, str) or not cat_name.strip():
             raise JsonExpenseImportError(f"lines[{idx}].expense_category must be a non-empty string.")
-        cat_row = self.repo.find_account_by_name(cat_name.strip(), account_type="EXPENSE")
+        cat_name_s = cat_name.strip()
+        cat_row = (cat_by_name or {}).get(cat_name_s.lower()) or self.repo.find_account_by_name(
+            cat_name_s, account_type="EXPENSE"
+        )
         if not cat_row:
             raise JsonExpenseImportError(f"lines[{idx}].expense_category not found/active EXPENSE account: {cat_name}")
 
@@ -1005,23 +1262,31 @@ class JsonExpenseImportService:
         lines: List[Dict[str, Any]],
     ) -> Tuple[List[Dict[str, Any]], float, float]:
         items: List[Dict[str, Any]] = []
-        total_dom = 0.0
-        total_org = 0.0
+        items_append = items.append
+        get_fields = _LINE_FIELDS
+        ccy = data["currency_original"]
+        doms: List[float] = []
+        orgs: List[float] = []
 
+        # Amounts are already floats (_parse_nonzero_number).
         for ln in lines:
-            items.append(
+            code, amt_dom, amt_org, text = get_fields(ln)
+            items_append(
                 {
-                    "account_code": ln["account_code"],
+                    "account_code": code,
                     "dc": "D",
-                    "amount_domestic": ln["amount_domestic"],
-                    "currency_original": data["currency_original"],
-                    "amount_original": ln["amount_original"],
-                    "item_text": ln["item_text"],
+                    "amount_domestic": amt_dom,
+                    "currency_original": ccy,
+                    "amount_original": amt_org,
+                    "item_text": text,
                 }
             )
-            total_dom += float(ln["amount_domestic"])
-            total_org += float(ln["amount_original"])
+            doms.append(amt_dom)
+            orgs.append(amt_org)
 
+        # fsum keeps the credit line exactly equal to the sum of the debits.
+        total_dom = math.fsum(doms)
+        total_org = math.fsum(orgs)
         if abs(total_dom) <= 1e-9:
             raise JsonExpenseImportError("Total amount_domestic must not be zero.")
 
@@ -1030,40 +1295,44 @@ class JsonExpenseImportService:
                 "account_code": data["payment_account_code"],
                 "dc": "C",
                 "amount_domestic": total_dom,
-                "currency_original": data["currency_original"],
+                "currency_original": ccy,
                 "amount_original": total_org,
                 "item_text": None,
             }
         )
-
-        # Final guard against imbalance (should not happen)
-        diff = sum(it["amount_domestic"] if it["dc"] == "D" else -it["amount_domestic"] for it in items)
-        if abs(diff) > 1e-6:
-            raise JsonExpenseImportError(f"Debit/Credit not balanced after build. diff={diff:.6f}")
-
+        # The credit line is total_dom itself, so the entry balances by
+        # construction; save_entry_full_replace still re-checks it.
         return items, total_dom, total_org
 
     @staticmethod
-    def _parse_nonzero_number(value: Any, field_name: str) -> float:
-        try:
-            num = float(value)
-        except Exception:
-            raise JsonExpenseImportError(f"{field_name} must be a non-zero number.") from None
-        if not math.isfinite(num) or abs(num) < 1e-9:
+    def _parse_nonzero_number(value: Any, field_name: str, _isfinite=math.isfinite) -> float:
+        if isinstance(value, float):
+            num = value  # JSON numbers with a fraction arrive as float already
+        else:
+            try:
+                num = float(value)
+            except (TypeError, ValueError, OverflowError):
+                raise JsonExpenseImportError(f"{field_name} must be a non-zero number.") from None
+        if not _isfinite(num) or abs(num) < 1e-9:
             raise JsonExpenseImportError(f"{field_name} must be a non-zero number.")
         return num
 
     @staticmethod
+    @lru_cache(maxsize=1024)
     def _is_valid_iso_date(value: str) -> bool:
+        # fromisoformat also takes YYYYMMDD / week dates on 3.11+, so the
+        # shape is checked first; it then only validates the calendar day.
+        if not _ISO_DATE_RE.match(value):
+            return False
         try:
             dt.date.fromisoformat(value)
             return True
-        except Exception:
+        except ValueError:
             return False
 
     @staticmethod
     def _is_valid_currency(value: str) -> bool:
-        return len(value) == 3 and value.isalpha() and value.isupper()
+        return bool(value) and _CCY_RE(value) is not None
 
 
 # -------------------------
@@ -1424,13 +1693,12 @@ class CameraCaptureDialog(QDialog):
             QMessageBox.warning(self, "Invalid file", "Only JPG/PNG allowed.")
             self.reject()
             return
-        size = os.path.getsize(path)
-        if size > ATTACH_MAX_BYTES:
+        data = read_file_capped(path)
+        if data is None:
             QMessageBox.warning(self, "File too large", "File must be 10MB or smaller.")
             self.reject()
             return
-        with open(path, "rb") as f:
-            self.captured_bytes = f.read()
+        self.captured_bytes = data
         self.captured_mime = mime
         self.captured_name = os.path.basename(path)
         self.accept()
@@ -1514,16 +1782,14 @@ class AiImportController(QObject):
         if mime not in ALLOWED_MIME:
             QMessageBox.warning(self.parent_widget, "Invalid file", "Only JPG, PNG, or PDF files are allowed.")
             return
-        size = os.path.getsize(path)
-        if size > ATTACH_MAX_BYTES:
-            QMessageBox.warning(self.parent_widget, "File too large", "File must be 10MB or smaller.")
-            return
         try:
-            with open(path, "rb") as f:
-                data = f.read()
+            data = read_file_capped(path)
         except Exception as e:
             QMessageBox.critical(self.parent_widget, "Error", f"Failed to read file: {e}")
             return
+        if data is None:
+            QMessageBox.warning(self.parent_widget, "File too large", "File must be 10MB or smaller.")
+            return
         self._start_worker(source="file", file_bytes=data, mime_type=mime, file_name=os.path.basename(path))
 
     def import_from_camera(self):
@@ -1767,6 +2033,8 @@ class DebibiChatPage(QWidget):
         self._bg_label.setScaledContents(False)
         self._bg_label.setAlignment(Qt.AlignCenter)
         self._bg_label.setStyleSheet("background: transparent;")
+        # Decode the avatar once; resize events only rescale it
+        self._bg_source = QPixmap(os.path.join("assets", "debibi_avatar.png"))
         self.log_container.setStyleSheet("background: transparent;")
         self.log_layout = QVBoxLayout(self.log_container)
         self.log_layout.setAlignment(Qt.AlignTop)
@@ -2017,8 +2285,7 @@ class DebibiChatPage(QWidget):
     def _resize_bg(self):
         if not hasattr(self, "_bg_label") or not shiboken6.isValid(self._bg_label):
             return
-        pix = QPixmap(os.path.join("assets", "debibi_avatar.png"))
-        if pix.isNull():
+        if self._bg_source.isNull():
             self._bg_label.hide()
             return
         vw = self.scroll.viewport().width()
@@ -2027,7 +2294,7 @@ class DebibiChatPage(QWidget):
             return
         target_w = int(vw * 0.8)
         target_h = int(vh * 0.8)
-        pix = pix.scaled(target_w, target_h, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        pix = self._bg_source.scaled(target_w, target_h, Qt.KeepAspectRatio, Qt.SmoothTransformation)
         self._bg_label.setPixmap(pix)
         self._bg_label.resize(self.log_container.size())
         self._bg_label.lower()
@@ -2047,52 +2314,248 @@ class DebibiChatPage(QWidget):
             pass
 
 
+# -------------------------
+# UI: Shared combo box models
+# -------------------------
+
+# Per Repo: (accounts_version, rows, model, codes in model row order). Weak
+# keys let an entry, and its model, go away with the Repo it was built for.
+_ACCOUNTS_CACHE: "weakref.WeakKeyDictionary[Repo, Tuple[int, List[sqlite3.Row], QStandardItemModel, List[str]]]" = (
+    weakref.WeakKeyDictionary()
+)
+_CCY_MODELS: Dict[str, QStringListModel] = {}
+_BASE_CURRENCIES: Tuple[str, ...] = ("USD", "EUR", "JPY", "CNY")
+
+
+def shared_active_accounts(repo: Repo) -> Tuple[List[sqlite3.Row], QStandardItemModel, List[str]]:
+    """Active accounts, a combo model over their names and their codes in model
+    row order, rebuilt only when the repo's account version changes. A new
+    model is built on change so combos still showing the old one are left
+    untouched."""
+    hit = _ACCOUNTS_CACHE.get(repo)
+    if hit is not None and hit[0] == repo.accounts_version:
+        return hit[1], hit[2], hit[3]
+    rows = repo.list_accounts("is_active=1")
+    model = QStandardItemModel()
+    for r in rows:
+        model.appendRow(QStandardItem(r["account_name"]))
+    codes = [r["account_code"] for r in rows]
+    _ACCOUNTS_CACHE[repo] = (repo.accounts_version, rows, model, codes)
+    return rows, model, codes
+
+
+def shared_currency_model(dom: str) -> QStringListModel:
+    model = _CCY_MODELS.get(dom)
+    if model is None:
+        codes = [dom, *(c for c in _BASE_CURRENCIES if c != dom)]
+        model = _CCY_MODELS[dom] = QStringListModel(codes)
+    return model
+
+
 # -------------------------
 # UI: Reusable list widgets
 # -------------------------
 
-class SectionHeaderItem(QListWidgetItem):
-    def __init__(self, text: str):
-        super().__init__(text)
-        f = QFont()
-        f.setBold(True)
-        self.setFont(f)
-        self.setFlags(Qt.ItemIsEnabled)  # not selectable
-        self.setBackground(QColor("#e0e0e0"))
-        self.setForeground(QColor("#2d2018"))
-        self.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        self.setSizeHint(QSize(10, 32))
-        self.setData(Qt.UserRole, {"kind": "section"})
+def section_payload(text: str) -> Dict[str, Any]:
+    return {"kind": "section", "text": text}
 
 
-class CardItemWidget(QWidget):
-    def __init__(self, icon_text: str, title: str, amount_text: str):
-        super().__init__()
-        lay = QHBoxLayout(self)
-        lay.setContentsMargins(12, 8, 12, 8)
-        lay.setSpacing(10)
+class CardListModel(QAbstractListModel):
+    """Flat list of card payloads for a QListView: section headers
+    ({"kind": "section", "text": ...}) and delegate-painted rows
+    ({"kind": "row", ...}). Each payload is exposed under Qt.UserRole."""
 
-        icon = QLabel(icon_text)
-        icon.setFixedWidth(28)
-        icon.setAlignment(Qt.AlignCenter)
+    SECTION_BG = QColor("#e0e0e0")
+    SECTION_FG = QColor("#2d2018")
+    SECTION_SIZE = QSize(10, 32)
+    _section_font: Optional[QFont] = None  # built on first use; QFont needs the app
 
-        mid = QLabel(title or "")
-        mid.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: List[Dict[str, Any]] = []
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        payload = self._rows[index.row()]
+        if role == Qt.UserRole:
+            return payload
+        if payload["kind"] != "section":
+            return None  # rows are painted entirely by the view's delegate
+        if role == Qt.DisplayRole:
+            return payload["text"]
+        if role == Qt.FontRole:
+            if CardListModel._section_font is None:
+                f = QFont()
+                f.setBold(True)
+                CardListModel._section_font = f
+            return CardListModel._section_font
+        if role == Qt.BackgroundRole:
+            return self.SECTION_BG
+        if role == Qt.ForegroundRole:
+            return self.SECTION_FG
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignLeft | Qt.AlignVCenter
+        if role == Qt.SizeHintRole:
+            return self.SECTION_SIZE
+        return None
 
-        right = QLabel(amount_text)
-        right.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        right.setFixedWidth(120)
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        if self._rows[index.row()]["kind"] == "section":
+            return Qt.ItemIsEnabled  # not selectable
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
 
-        lay.addWidget(icon)
-        lay.addWidget(mid)
-        lay.addWidget(right)
+    def reset(self, rows: List[Dict[str, Any]]):
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
 
+    def append(self, rows: List[Dict[str, Any]]):
+        if not rows:
+            return
+        n = len(self._rows)
+        self.beginInsertRows(QModelIndex(), n, n + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
 
-class CardRowItem(QListWidgetItem):
-    def __init__(self, payload: Dict[str, Any]):
-        super().__init__("")
-        self.setSizeHint(QSize(10, 44))
-        self.setData(Qt.UserRole, payload)
+
+class CardDelegate(QStyledItemDelegate):
+    """Paints card rows (icon | title | amount) straight from the item payload.
+
+    Row payloads carry "icon", "title" and "amount_text"; section headers and
+    anything else fall through to the default item painting.
+    """
+
+    MARGIN_H = 12
+    MARGIN_V = 8
+    SPACING = 10
+    ICON_W = 28
+    AMOUNT_W = 120
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index):
+        data = index.data(Qt.UserRole) or {}
+        if data.get("kind") != "row":
+            super().paint(painter, option, index)
+            return
+
+        # Background, hover and selection come from the style as usual.
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        opt.text = ""
+        style = opt.widget.style() if opt.widget else QApplication.style()
+        style.drawControl(QStyle.CE_ItemViewItem, opt, painter, opt.widget)
+
+        r = option.rect.adjusted(self.MARGIN_H, self.MARGIN_V, -self.MARGIN_H, -self.MARGIN_V)
+        icon_rect = QRect(r.left(), r.top(), self.ICON_W, r.height())
+        amount_rect = QRect(r.right() - self.AMOUNT_W + 1, r.top(), self.AMOUNT_W, r.height())
+        title_left = icon_rect.right() + 1 + self.SPACING
+        title_rect = QRect(title_left, r.top(), max(0, amount_rect.left() - self.SPACING - title_left), r.height())
+
+        selected = bool(option.state & QStyle.State_Selected)
+        painter.save()
+        painter.setPen(option.palette.color(QPalette.HighlightedText if selected else QPalette.Text))
+        painter.drawText(icon_rect, Qt.AlignCenter, data.get("icon", ""))
+        title = option.fontMetrics.elidedText(data.get("title") or "", Qt.ElideRight, title_rect.width())
+        painter.drawText(title_rect, Qt.AlignLeft | Qt.AlignVCenter, title)
+        painter.drawText(amount_rect, Qt.AlignRight | Qt.AlignVCenter, data.get("amount_text", ""))
+        painter.restore()
+
+    def sizeHint(self, option: QStyleOptionViewItem, index) -> QSize:
+        data = index.data(Qt.UserRole) or {}
+        if data.get("kind") == "row":
+            return QSize(10, 44)
+        return super().sizeHint(option, index)
+
+
+class AccountDelegate(QStyledItemDelegate):
+    """Paints balance sheet account rows (icon | name over type | status over
+    an Edit button) from the item payload; a click on the painted button
+    emits editRequested with the account code."""
+
+    editRequested = Signal(str)
+
+    MARGIN_H = 10
+    MARGIN_V = 8
+    SPACING = 10
+    ICON_W = 24
+    BUTTON_W = 64
+    BUTTON_H = 24
+
+    def _edit_rect(self, rect: QRect) -> QRect:
+        r = rect.adjusted(self.MARGIN_H, self.MARGIN_V, -self.MARGIN_H, -self.MARGIN_V)
+        return QRect(r.right() - self.BUTTON_W + 1, r.bottom() - self.BUTTON_H + 1, self.BUTTON_W, self.BUTTON_H)
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index):
+        data = index.data(Qt.UserRole) or {}
+        if data.get("kind") != "row":
+            super().paint(painter, option, index)
+            return
+
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        opt.text = ""
+        style = opt.widget.style() if opt.widget else QApplication.style()
+        style.drawControl(QStyle.CE_ItemViewItem, opt, painter, opt.widget)
+
+        r = option.rect.adjusted(self.MARGIN_H, self.MARGIN_V, -self.MARGIN_H, -self.MARGIN_V)
+        btn_rect = self._edit_rect(option.rect)
+        status_rect = QRect(btn_rect.left(), r.top(), self.BUTTON_W, r.height() - self.BUTTON_H - 4)
+        icon_rect = QRect(r.left(), r.top(), self.ICON_W, r.height())
+        text_left = icon_rect.right() + 1 + self.SPACING
+        text_w = max(0, btn_rect.left() - self.SPACING - text_left)
+        half = r.height() // 2
+        name_rect = QRect(text_left, r.top(), text_w, half)
+        type_rect = QRect(text_left, r.top() + half, text_w, r.height() - half)
+
+        selected = bool(option.state & QStyle.State_Selected)
+        text_color = option.palette.color(QPalette.HighlightedText if selected else QPalette.Text)
+        painter.save()
+        painter.setPen(text_color)
+        painter.drawText(icon_rect, Qt.AlignCenter, data.get("icon", ""))
+        name = option.fontMetrics.elidedText(data.get("account_name") or "", Qt.ElideRight, text_w)
+        painter.drawText(name_rect, Qt.AlignLeft | Qt.AlignBottom, name)
+
+        small = QFont(option.font)
+        small.setPixelSize(12)
+        painter.setFont(small)
+        painter.setPen(text_color if selected else QColor("#666"))
+        painter.drawText(type_rect, Qt.AlignLeft | Qt.AlignTop, data.get("type_label", ""))
+
+        painter.setFont(option.font)
+        active = bool(data.get("is_active"))
+        painter.setPen(text_color if selected else QColor("#0a7a0a" if active else "#a00"))
+        painter.drawText(status_rect, Qt.AlignRight | Qt.AlignVCenter, "Active" if active else "Inactive")
+        painter.restore()
+
+        btn = QStyleOptionButton()
+        btn.rect = btn_rect
+        btn.text = "Edit"
+        btn.state = QStyle.State_Enabled | QStyle.State_Raised
+        btn.palette = option.palette
+        style.drawControl(QStyle.CE_PushButton, btn, painter, opt.widget)
+
+    def sizeHint(self, option: QStyleOptionViewItem, index) -> QSize:
+        data = index.data(Qt.UserRole) or {}
+        if data.get("kind") == "row":
+            return QSize(10, 64)
+        return super().sizeHint(option, index)
+
+    def editorEvent(self, event, model, option: QStyleOptionViewItem, index) -> bool:
+        if (
+            event.type() == QEvent.MouseButtonRelease
+            and event.button() == Qt.LeftButton
+            and self._edit_rect(option.rect).contains(event.position().toPoint())
+        ):
+            data = index.data(Qt.UserRole) or {}
+            if data.get("kind") == "row":
+                self.editRequested.emit(data["account_code"])
+                return True
+        return super().editorEvent(event, model, option, index)
 
 
 class ClickableLabel(QLabel):
@@ -2138,11 +2601,18 @@ class AttachmentViewerDialog(QDialog):
         lay.addLayout(top)
         lay.addWidget(self.label)
 
+        # While the window is being dragged, rescale with the cheap filter and
+        # do a single smooth pass once resizing pauses.
+        self._smooth_timer = QTimer(self)
+        self._smooth_timer.setSingleShot(True)
+        self._smooth_timer.setInterval(120)
+        self._smooth_timer.timeout.connect(self._apply_scaled_pixmap)
+
         self.setMinimumSize(320, 240)
         self.resize(900, 700)
         self._apply_scaled_pixmap()
 
-    def _apply_scaled_pixmap(self):
+    def _apply_scaled_pixmap(self, mode: Qt.TransformationMode = Qt.SmoothTransformation):
         if not self._orig_pixmap or self._orig_pixmap.isNull():
             self.label.setPixmap(QPixmap())
             self.label.setText("Preview unavailable")
@@ -2150,13 +2620,14 @@ class AttachmentViewerDialog(QDialog):
         target = self.label.size()
         if target.width() < 2 or target.height() < 2:
             target = QSize(10, 10)
-        scaled = self._orig_pixmap.scaled(target, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        scaled = self._orig_pixmap.scaled(target, Qt.KeepAspectRatio, mode)
         self.label.setPixmap(scaled)
         self.label.setText("")
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
-        self._apply_scaled_pixmap()
+        self._apply_scaled_pixmap(Qt.FastTransformation)
+        self._smooth_timer.start()
 
     def _save_attachment(self):
         if not self._file_bytes:
@@ -2190,7 +2661,14 @@ class NoteFieldSection(QObject):
         self.add_btn.clicked.connect(self._show_note_field)
         self.note_shown_with_empty = False
         self._view_mode = False
-        self.note.textChanged.connect(self.update_visibility)
+        self._visibility_scheduled = False
+        # Typing only matters when the note crosses empty <-> non-empty, so
+        # keystrokes are debounced into one check per pause.
+        self._typing_timer = QTimer(self)
+        self._typing_timer.setSingleShot(True)
+        self._typing_timer.setInterval(50)
+        self._typing_timer.timeout.connect(self._flush_visibility)
+        self.note.textChanged.connect(self._typing_timer.start)
         self.update_visibility()
 
     def wrap_widget(self) -> QWidget:
@@ -2206,11 +2684,18 @@ class NoteFieldSection(QObject):
         if self._view_mode:
             return
         self.note_shown_with_empty = True
-        self.update_visibility()
+        self._flush_visibility()
         self.note.setFocus()
 
     def update_visibility(self):
-        has_text = bool(self.note.toPlainText().strip())
+        if not self._visibility_scheduled:
+            self._visibility_scheduled = True
+            QTimer.singleShot(0, self._flush_visibility)
+
+    def _flush_visibility(self):
+        self._visibility_scheduled = False
+        doc = self.note.document()
+        has_text = not doc.isEmpty() and bool(doc.toRawText().strip())
         if has_text:
             self.note_shown_with_empty = False
         show_note = has_text or self.note_shown_with_empty
@@ -2232,6 +2717,10 @@ class NoteFieldSection(QObject):
         self.note.setPlainText(text or "")
         self.update_visibility()
 
+    def clear(self):
+        self.note_shown_with_empty = False
+        self.set_text("")
+
     def text(self) -> str:
         return self.note.toPlainText()
 
@@ -2247,7 +2736,20 @@ class AttachmentSection(QObject):
         self.attach_name: Optional[str] = None
         self.attach_deleted: bool = False
         self.attach_existing_present: bool = False
+        self.attach_changed: bool = False  # user picked new data since load/save
+        self._blob_loader: Optional[Callable[[], bytes]] = None
+        # Identifies the current attachment without its bytes: (entry_uuid,
+        # rowid) for a stored one, a fresh object() for a picked file.
+        self._attach_key: Any = None
         self.view_mode: bool = False
+        self._preview_token = 0
+        # (attachment key, preview pixmap) of the last finished decode, so a
+        # hit needs no blob read.
+        self._preview_cache: Optional[Tuple[Any, QPixmap]] = None
+        self._preview_pending: Any = None
+        self._preview_signals = _PreviewSignals(self)
+        self._preview_signals.finished.connect(self._on_preview_ready)
+        self._preview_scheduled = False
 
         self.preview = ClickableLabel("No attachment")
         self.preview.setAlignment(Qt.AlignLeft)
@@ -2293,35 +2795,57 @@ class AttachmentSection(QObject):
         self.add_btn.setEnabled(not view_mode)
         self.update_preview()
 
-    def load_existing(self, att_row: Optional[sqlite3.Row]):
-        if att_row:
-            self.attach_data = att_row["file_blob"]
-            self.attach_mime = att_row["mime_type"]
-            self.attach_name = att_row["file_name"]
-            self.attach_deleted = False
+    def load_existing(self, meta: Optional[sqlite3.Row], loader: Optional[Callable[[], bytes]] = None):
+        """Show a stored attachment from its metadata; `loader` fetches the
+        blob the first time the bytes are actually needed."""
+        self.attach_data = None
+        self.attach_deleted = False
+        self.attach_changed = False
+        if meta:
+            self.attach_mime = meta["mime_type"]
+            self.attach_name = meta["file_name"]
             self.attach_existing_present = True
+            self._blob_loader = loader
+            self._attach_key = (meta["entry_uuid"], meta["rowid"])
         else:
-            self.attach_data = None
             self.attach_mime = None
             self.attach_name = None
-            self.attach_deleted = False
             self.attach_existing_present = False
+            self._blob_loader = None
+            self._attach_key = None
         self.update_preview()
 
+    def load_for_entry(self, repo: Repo, entry_uuid: str):
+        meta = repo.get_attachment_meta(entry_uuid)
+        self.load_existing(meta, (lambda: repo.read_attachment_blob(meta)) if meta else None)
+
+    def _ensure_data(self) -> Optional[bytes]:
+        if self.attach_data is None and self._blob_loader is not None and not self.attach_deleted:
+            loader, self._blob_loader = self._blob_loader, None
+            self.attach_data = loader() or None
+        return self.attach_data
+
     def save(self, repo: Repo, entry_uuid: Optional[str]):
         if not entry_uuid:
             return
-        if self.attach_data and self.attach_mime:
+        # Only write what the user changed; an untouched stored blob stays as is.
+        if self.attach_changed and self.attach_data and self.attach_mime:
             repo.upsert_attachment(entry_uuid, self.attach_name, self.attach_mime, self.attach_data)
             self.attach_existing_present = True
             self.attach_deleted = False
-        elif self.attach_deleted or self.attach_existing_present:
+            self.attach_changed = False
+            # The upsert keeps the row's rowid, so a cached preview under the
+            # stored key would now be stale.
+            self._preview_cache = None
+        elif self.attach_deleted:
             repo.delete_attachment(entry_uuid)
             self.attach_existing_present = False
+            self.attach_deleted = False
+            self._preview_cache = None
 
     # --- UI operations
     def _attachment_pixmap_full(self) -> Optional[QPixmap]:
-        if not self.attach_data or not self.attach_mime:
+        if not self._ensure_data() or not self.attach_mime:
             return None
         if self.attach_mime in ("image/jpeg", "image/png"):
             return pixmap_from_image_bytes(self.attach_data, QSize(0, 0))
@@ -2330,8 +2854,8 @@ class AttachmentSection(QObject):
     def on_attachment_clicked(self):
         if not self.has_attachment():
             return
-        if not self.attach_data:
-            QMessageBox.warning(self.owner, "Attachment", "Attachment is not loaded in memory.")
+        if not self._ensure_data():
+            QMessageBox.warning(self.owner, "Attachment", "Attachment could not be loaded.")
             return
         if self.attach_mime == "application/pdf":
             self._download_attachment()
@@ -2347,7 +2871,7 @@ class AttachmentSection(QObject):
         dlg.show()
 
     def _download_attachment(self):
-        if not self.attach_data:
+        if not self._ensure_data():
             QMessageBox.warning(self.owner, "Attachment", "Attachment data is missing.")
             return
         default = self.attach_name or "attachment"
@@ -2376,55 +2900,90 @@ class AttachmentSection(QObject):
         if mime not in ALLOWED_MIME:
             QMessageBox.warning(self.owner, "Invalid file", "Only JPG, PNG, or PDF files are allowed.")
             return
-        size = os.path.getsize(path)
-        if size > ATTACH_MAX_BYTES:
-            QMessageBox.warning(self.owner, "File too large", "File must be 10MB or smaller.")
-            return
         try:
-            with open(path, "rb") as f:
-                data = f.read()
+            data = read_file_capped(path)
         except Exception as e:
             QMessageBox.critical(self.owner, "Error", f"Failed to read file: {e}")
             return
+        if data is None:
+            QMessageBox.warning(self.owner, "File too large", "File must be 10MB or smaller.")
+            return
+        # Trust the content over the extension (e.g. a PNG saved as .jpg).
+        mime = sniff_mime(data)
+        if mime is None:
+            QMessageBox.warning(self.owner, "Invalid file", "The file content is not a JPG, PNG, or PDF.")
+            return
 
         self.attach_data = data
         self.attach_mime = mime
         self.attach_name = os.path.basename(path)
         self.attach_deleted = False
+        self.attach_changed = True
+        self._blob_loader = None
+        self._attach_key = object()
         self.update_preview()
 
+    def _show_preview_unavailable(self):
+        msg = "Preview not available"
+        if self.attach_mime == "application/pdf":
+            msg = "PDF attached - click to download"
+        self.preview.setText(msg)
+
+    def _on_preview_ready(self, token: int, img: QImage):
+        if token != self._preview_token:
+            return
+        key, self._preview_pending = self._preview_pending, None
+        if img.isNull():
+            self._show_preview_unavailable()
+            return
+        pixmap = QPixmap.fromImage(img)
+        if key is not None:
+            self._preview_cache = (key, pixmap)
+        self._set_preview_pixmap(pixmap)
+
+    def _set_preview_pixmap(self, pixmap: QPixmap):
+        self.preview.setPixmap(pixmap)
+        self.preview.setScaledContents(False)
+        self.preview.setText("")
+
     def on_remove_attachment(self):
         self.attach_data = None
         self.attach_mime = None
         self.attach_name = None
         self.attach_deleted = True
+        self.attach_changed = False
         self.attach_existing_present = False
+        self._blob_loader = None
+        self._attach_key = None
         self.update_preview()
 
     def update_preview(self):
-        max_size = QSize(300, 200)
+        """Coalesce refreshes: reset/load/mode changes during one event turn
+        share a single trailing rebuild."""
+        if not self._preview_scheduled:
+            self._preview_scheduled = True
+            QTimer.singleShot(0, self._flush_preview_update)
+
+    def _flush_preview_update(self):
+        self._preview_scheduled = False
         has_attachment = self.has_attachment()
-        pixmap: Optional[QPixmap] = None
-        if has_attachment and self.attach_data and self.attach_mime:
-            if self.attach_mime in ("image/jpeg", "image/png"):
-                pixmap = pixmap_from_image_bytes(self.attach_data, max_size)
-            elif self.attach_mime == "application/pdf":
-                pixmap = pixmap_from_pdf_bytes(self.attach_data, max_size)
+        self._preview_token += 1  # any decode still in flight is now stale
 
         self.preview.setVisible(has_attachment)
-        if has_attachment:
-            if pixmap:
-                self.preview.setPixmap(pixmap)
-                self.preview.setScaledContents(False)
-                self.preview.setText("")
-            else:
-                self.preview.setPixmap(QPixmap())
-                msg = "Preview not available"
-                if self.attach_mime == "application/pdf":
-                    msg = "PDF attached - click to download"
-                self.preview.setText(msg)
+        self.preview.setPixmap(QPixmap())
+        cached = self._preview_cache
+        if has_attachment and cached is not None and cached[0] == self._attach_key:
+            self._set_preview_pixmap(cached[1])
+        # Only a previewable type is worth reading the blob for.
+        elif has_attachment and self.attach_mime in ALLOWED_MIME and self._ensure_data():
+            self.preview.setText("Loading preview...")
+            self._preview_pending = self._attach_key
+            PreviewTask.pool().start(
+                PreviewTask(self._preview_token, self.attach_data, self.attach_mime, QSize(300, 200), self._preview_signals)
+            )
+        elif has_attachment:
+            self._show_preview_unavailable()
         else:
-            self.preview.setPixmap(QPixmap())
             self.preview.setText("")
 
         self.preview.setCursor(Qt.PointingHandCursor if has_attachment else Qt.ArrowCursor)
@@ -2456,51 +3015,93 @@ class JournalCardList(QWidget):
         v = QVBoxLayout(self)
         v.setContentsMargins(0, 0, 0, 0)
 
-        self.list = QListWidget()
+        self.list = QListView()
         self.list.setSelectionMode(QAbstractItemView.SingleSelection)
         self.list.setSpacing(6)
-        self.list.itemClicked.connect(self.on_item_clicked)
+        self.list.setItemDelegate(CardDelegate(self.list))
+        self.model = CardListModel(self.list)
+        self.list.setModel(self.model)
+        self.list.clicked.connect(self.on_item_clicked)
         v.addWidget(self.list)
 
         self.on_open_entry = None  # callback(entry_uuid)
+        # Incremental fill state: rows are added FILL_CHUNK at a time, one
+        # batch per event-loop turn, so long journals don't freeze the UI.
+        # The pump is owned by the widget, so pending ticks die with it.
+        self._fill_timer = QTimer(self)
+        self._fill_timer.setSingleShot(True)
+        self._fill_timer.setInterval(0)
+        self._fill_timer.timeout.connect(self._fill_step)
+        self._cols: Optional[Dict[str, Any]] = None
+        self._next_row = 0
+        self._last_date: Optional[str] = None
         self.refresh()
 
+    FILL_CHUNK = 200
+
     def refresh(self):
-        self.list.clear()
+        self._fill_timer.stop()  # drop any batch still queued from a previous refresh
         if self.mode == "expense":
-            rows = self.repo.list_expense_list()
+            self._cols = self.repo.list_journal_items_soa(account_type="EXPENSE")
         elif self.mode == "account":
-            rows = self.repo.list_account_transactions(self.account_code or "")
+            self._cols = self.repo.list_journal_items_soa(account_code=self.account_code or "")
         else:
-            rows = []
+            self._cols = None
+            self.model.reset([])
+            return
+        self._next_row = 0
+        self._last_date = None
+        self.model.reset(self._next_batch())
+        self._schedule_fill()
 
-        last_date = None
-        for r in rows:
-            d = r["accounting_date"]
+    def _schedule_fill(self):
+        if self._next_row < len(self._cols["accounting_date"]):
+            self._fill_timer.start()
+
+    def _fill_step(self):
+        if self._cols is None:
+            return
+        self.model.append(self._next_batch())
+        self._schedule_fill()
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        """Payloads for the next FILL_CHUNK journal rows (plus date headers)."""
+        cols = self._cols
+        dates = cols["accounting_date"]
+        uuids = cols["entry_uuid"]
+        titles = cols["entry_title"]
+        amounts = cols["amount_domestic"]
+        codes = cols["account_code"]
+        types = cols["account_type"]
+
+        start = self._next_row
+        stop = min(start + self.FILL_CHUNK, len(dates))
+        last_date = self._last_date
+        out: List[Dict[str, Any]] = []
+        add = out.append
+        money = money_formatter(self.dom)
+        # Rows arrive ordered by date, so each run of equal dates is one section.
+        for i in range(start, stop):
+            d = dates[i]
             if d != last_date:
-                self.list.addItem(SectionHeaderItem(d))
+                add(section_payload(d))
                 last_date = d
+            account_code = codes[i]
+            icon = EXPENSE_ICON_BY_CODE.get(account_code, "🧾") if self.mode == "expense" else bs_icon(account_code, types[i])
 
-            entry_uuid = r["entry_uuid"]
-            store = r["entry_title"] or ""
-            amt = float(r["amount_domestic"])
-            amt_text = fmt_money(amt, self.dom)
-
-            account_code = r["account_code"]
-            account_type = r["account_type"]
-
-            icon = EXPENSE_ICON_BY_CODE.get(account_code, "🧾") if self.mode == "expense" else bs_icon(account_code, account_type)
-
-            payload = {
+            add({
                 "kind": "row",
-                "entry_uuid": entry_uuid,
-            }
-            item = CardRowItem(payload)
-            self.list.addItem(item)
-            self.list.setItemWidget(item, CardItemWidget(icon, store, amt_text))
+                "entry_uuid": uuids[i],
+                "icon": icon,
+                "title": titles[i] or "",
+                "amount_text": money(amounts[i]),
+            })
+        self._next_row = stop
+        self._last_date = last_date
+        return out
 
-    def on_item_clicked(self, item: QListWidgetItem):
-        data = item.data(Qt.UserRole) or {}
+    def on_item_clicked(self, index: QModelIndex):
+        data = index.data(Qt.UserRole) or {}
         if data.get("kind") == "section":
             return
         if data.get("kind") == "row" and self.on_open_entry:
@@ -2516,40 +3117,46 @@ class BalanceSheetOverviewWidget(QWidget):
         v = QVBoxLayout(self)
         v.setContentsMargins(0, 0, 0, 0)
 
-        self.list = QListWidget()
+        self.list = QListView()
         self.list.setSpacing(6)
-        self.list.itemClicked.connect(self.on_item_clicked)
+        self.list.setItemDelegate(CardDelegate(self.list))
+        self.model = CardListModel(self.list)
+        self.list.setModel(self.model)
+        self.list.clicked.connect(self.on_item_clicked)
         v.addWidget(self.list)
 
         self.on_open_account = None  # callback(account_code, account_name)
         self.refresh()
 
     def refresh(self):
-        self.list.clear()
-        rows = self.repo.list_balance_sheet_overview()
-        last_type = None
-        for r in rows:
-            t = r["account_type"]
-            if t != last_type:
-                self.list.addItem(SectionHeaderItem(ACCOUNT_TYPE_LABEL.get(t, t)))
-                last_type = t
-
-            account_code = r["account_code"]
-            name = r["account_name"]
-            bal = float(r["balance_domestic"])
-            bal_text = fmt_money(bal, self.dom)
+        # One model reset per refresh: the view relayouts and repaints once.
+        self.model.reset(self._payloads())
 
-            payload = {
-                "kind": "row",
-                "account_code": account_code,
-                "account_name": name,
-            }
-            item = CardRowItem(payload)
-            self.list.addItem(item)
-            self.list.setItemWidget(item, CardItemWidget(bs_icon(account_code, t), name, bal_text))
+    def _payloads(self) -> List[Dict[str, Any]]:
+        rows = self.repo.list_balance_sheet_overview()
+        money = money_formatter(self.dom)
+        out: List[Dict[str, Any]] = []
+        for t, group in groupby(rows, key=itemgetter("account_type")):
+            out.append(section_payload(ACCOUNT_TYPE_LABEL.get(t, t)))
+            for r in group:
+                account_code = r["account_code"]
+                name = r["account_name"]
+                bal = float(r["balance_domestic"])
+                bal_text = money(bal)
+
+                payload = {
+                    "kind": "row",
+                    "account_code": account_code,
+                    "account_name": name,
+                    "icon": bs_icon(account_code, t),
+                    "title": name,
+                    "amount_text": bal_text,
+                }
+                out.append(payload)
+        return out
 
-    def on_item_clicked(self, item: QListWidgetItem):
-        data = item.data(Qt.UserRole) or {}
+    def on_item_clicked(self, index: QModelIndex):
+        data = index.data(Qt.UserRole) or {}
         if data.get("kind") == "section":
             return
         if data.get("kind") == "row" and self.on_open_account:
@@ -2861,22 +3468,132 @@ class AssetsTrendChart(QWidget):
 # Dialogs
 # -------------------------
 
-class ExpenseJournalDetailDialog(QDialog):
+_DC_ITEMS = ("D", "C")
+
+
+def make_amount_spinbox() -> QDoubleSpinBox:
+    sb = QDoubleSpinBox()
+    sb.setRange(-10_000_000, 10_000_000)
+    sb.setDecimals(2)
+    sb.setSingleStep(1.0)
+    return sb
+
+
+@contextmanager
+def bulk_fill_table(table: QTableWidget, rows: int):
+    """Resize `table` to `rows` empty rows and hold off repaints, signals and
+    ResizeToContents sizing until the caller has filled them; columns are
+    measured once on exit instead of after every row."""
+    header = table.horizontalHeader()
+    modes = [header.sectionResizeMode(c) for c in range(table.columnCount())]
+    for c, mode in enumerate(modes):
+        if mode == QHeaderView.ResizeToContents:
+            header.setSectionResizeMode(c, QHeaderView.Fixed)
+    table.setUpdatesEnabled(False)
+    table.blockSignals(True)
+    try:
+        table.setRowCount(rows)
+        yield
+    finally:
+        table.blockSignals(False)
+        for c, mode in enumerate(modes):
+            header.setSectionResizeMode(c, mode)
+        table.setUpdatesEnabled(True)
+
+
+class _JournalDialogMixin:
+    """View/edit toggling and save/delete shared by the journal detail dialogs.
+
+    Subclasses provide _collect_items() and _header_fields(), which returns
+    (entry_type, entry_title) for the entry being saved.
+    """
+
+    # Built on first delete and reused; the dialogs themselves are reused too.
+    _confirm_delete: Optional[QMessageBox] = None
+
+    def set_view_mode(self):
+        if self._mode == "view":
+            return
+        self._mode = "view"
+        self.view_mode = True
+        for w in self._mode_widgets:
+            w.setEnabled(False)
+        self.btn_delete.setEnabled(True)
+        self.btn_edit.setEnabled(True)
+        self.attach_section.set_view_mode(True)
+        self.note_section.set_view_mode(True)
+
+    def set_edit_mode(self):
+        if self._mode == "edit":
+            return
+        self._mode = "edit"
+        self.view_mode = False
+        for w in self._mode_widgets:
+            w.setEnabled(True)
+        self.btn_delete.setEnabled(True)
+        self.btn_edit.setEnabled(False)
+        self.btn_cancel.setText("Cancel")
+        self.attach_section.set_view_mode(False)
+        self.note_section.set_edit_mode()
+
+    def on_save(self):
+        try:
+            accounting_date = qdate_to_iso(self.date.date())
+            entry_type, entry_title = self._header_fields()
+            entry_text = self.note_section.text().strip() or None
+
+            if self.is_new:
+                self.entry_uuid = new_uuid()
+
+            items = self._collect_items()
+
+            self.repo.save_entry_full_replace(
+                entry_uuid=self.entry_uuid,
+                accounting_date=accounting_date,
+                entry_type=entry_type,
+                entry_title=entry_title,
+                entry_text=entry_text,
+                items=items,
+                is_new=self.is_new,
+            )
+            self.is_new = False
+            self.dirty = True
+            self.attach_section.save(self.repo, self.entry_uuid)
+            QMessageBox.information(self, "Saved", "Entry saved.")
+            self.accept()
+        except Exception as e:
+            QMessageBox.critical(self, "Save failed", str(e))
+
+    def on_delete(self):
+        if self.is_new or not self.entry_uuid:
+            return
+        box = self._confirm_delete
+        if box is None:
+            box = self._confirm_delete = QMessageBox(
+                QMessageBox.Question, "Delete", "Delete this entry?", QMessageBox.Yes | QMessageBox.No, self
+            )
+        if box.exec() != QMessageBox.Yes:
+            return
+        try:
+            self.repo.delete_entry(self.entry_uuid)
+            self.dirty = True
+            QMessageBox.information(self, "Deleted", "Entry deleted.")
+            self.accept()
+        except Exception as e:
+            QMessageBox.critical(self, "Delete failed", str(e))
+
+
+class ExpenseJournalDetailDialog(_JournalDialogMixin, QDialog):
     def __init__(self, repo: Repo, entry_uuid: Optional[str] = None, parent=None, start_edit_mode: bool = False):
         super().__init__(parent)
         self.repo = repo
         self.dom = self.repo.get_domestic_currency()
-        self.entry_uuid = entry_uuid
-        self.is_new = entry_uuid is None
-        self.start_edit_mode = start_edit_mode
+        self.dirty = False  # set once the repo has actually been written
 
-        self.setWindowTitle("Expense Journal Detail" if self.is_new else "Expense Journal Detail (View/Edit)")
         self.resize(400, 620)  # compact, dialog-like width slightly smaller than main window
 
         root = QVBoxLayout(self)
 
-        self.view_mode = not self.is_new
-
         form = QFormLayout()
         self.date = QDateEdit()
         self.date.setCalendarPopup(True)
@@ -2889,11 +3606,11 @@ class ExpenseJournalDetailDialog(QDialog):
         self.currency = QLineEdit()
         self.currency.setPlaceholderText(self.dom)
         self.currency.setText(self.dom)
+        self._ccy_norm = self.dom  # normalised currency text, kept by on_currency_changed
         self.currency.textChanged.connect(self.on_currency_changed)
 
         self.payment = QComboBox()
         self.payment_map: Dict[str, str] = {}
-        self._load_payment_accounts()
 
         form.addRow("Date", self.date)
         form.addRow("Store", self.store)
@@ -2918,7 +3635,7 @@ class ExpenseJournalDetailDialog(QDialog):
         self.btn_delete = QPushButton("Delete")
         self.btn_add_line = QPushButton("Add line")
         self.btn_save = QPushButton("Save")
-        self.btn_cancel = QPushButton("Close" if self.view_mode else "Cancel")
+        self.btn_cancel = QPushButton("Cancel")
         self.btn_save.setDefault(True)
 
         btn_row.addWidget(self.btn_edit)
@@ -2935,15 +3652,53 @@ class ExpenseJournalDetailDialog(QDialog):
         self.btn_cancel.clicked.connect(self.reject)
         self.btn_delete.clicked.connect(self.on_delete)
 
-        self.cat_map: Dict[str, str] = {}
-        self._load_categories()
-        self._refresh_original_amount_header(self.currency.text())
-        self.attach_section.set_view_mode(self.view_mode)
-        self.note_section.set_view_mode(self.view_mode)
+        # Category codes in cat_model row order; combos are read by index.
+        self.cat_codes: List[str] = []
+        # One category model shared by every line's combo box.
+        self.cat_model = QStandardItemModel(self)
+        # Repo.accounts_version the payment/category lists were built from.
+        self._lists_version: Optional[int] = None
+        # (category, domestic amount, original amount) per table row, in row order.
+        self._row_widgets: List[Tuple[QComboBox, QDoubleSpinBox, QDoubleSpinBox]] = []
+        # Widgets toggled together by set_view_mode / set_edit_mode.
+        self._mode_widgets = (self.date, self.store, self.currency, self.payment, self.table, self.btn_save, self.btn_add_line)
+        self._mode: Optional[str] = None
+        self.reset(entry_uuid, start_edit_mode)
+
+    def reset(self, entry_uuid: Optional[str] = None, start_edit_mode: bool = False):
+        """Reload the dialog for another entry (or a blank new one).
+
+        MainWindow keeps a single instance and calls this before each exec(),
+        so the widget tree is built once and only the data is refreshed.
+        """
+        self.entry_uuid = entry_uuid
+        self.is_new = entry_uuid is None
+        self.start_edit_mode = start_edit_mode
+        self.dirty = False
+        self.view_mode = not self.is_new
+        self._mode = None  # force the set_*_mode call below to apply fully
+
+        self.setWindowTitle("Expense Journal Detail" if self.is_new else "Expense Journal Detail (View/Edit)")
+        self.btn_cancel.setText("Close" if self.view_mode else "Cancel")
+        self.btn_edit.setVisible(not self.is_new)
+        self.btn_delete.setVisible(not self.is_new)
+
+        self.table.setRowCount(0)
+        self._row_widgets.clear()
+        if self._lists_version != self.repo.accounts_version:
+            self._load_payment_accounts()
+            self._load_categories()
+            self._lists_version = self.repo.accounts_version
+        elif "Cash" in self.payment_map:
+            self.payment.setCurrentText("Cash")
+        self.date.setDate(QDate.currentDate())
+        self.store.clear()
+        self.currency.setText(self.dom)
+        self.note_section.clear()
+        self.attach_section.load_existing(None)
+        self._refresh_original_amount_header(self._ccy_norm)
 
         if self.is_new:
-            self.btn_edit.setVisible(False)
-            self.btn_delete.setVisible(False)
             self.set_edit_mode()
             self.add_line()
         else:
@@ -2954,9 +3709,11 @@ class ExpenseJournalDetailDialog(QDialog):
                 self.set_view_mode()
 
     def _load_categories(self):
-        self.cat_map.clear()
-        for r in self.repo.list_expense_categories():
-            self.cat_map[r["account_name"]] = r["account_code"]
+        rows = self.repo.list_expense_categories()
+        self.cat_codes = [r["account_code"] for r in rows]
+        self.cat_model.clear()
+        for r in rows:
+            self.cat_model.appendRow(QStandardItem(r["account_name"]))
 
     def _refresh_original_amount_header(self, ccy: str):
         ccy = (ccy or "").strip().upper()
@@ -2969,80 +3726,55 @@ class ExpenseJournalDetailDialog(QDialog):
 
     def _load_payment_accounts(self):
         rows = self.repo.list_payment_accounts()
+        self.payment_map = {r["account_name"]: r["account_code"] for r in rows}
         self.payment.clear()
-        self.payment_map.clear()
-        for r in rows:
-            self.payment.addItem(r["account_name"])
-            self.payment_map[r["account_name"]] = r["account_code"]
+        self.payment.addItems(list(self.payment_map))
         if "Cash" in self.payment_map:
             self.payment.setCurrentText("Cash")
 
     def on_currency_changed(self, ccy: str):
-        ccy = ccy.strip().upper() if ccy else ""
-        self._refresh_original_amount_header(ccy or self.dom)
-        is_foreign = (ccy != "" and ccy != self.dom)
-        self.table.setColumnHidden(2, not is_foreign)
-
-    def set_view_mode(self):
-        self.view_mode = True
-        for w in [self.date, self.store, self.currency, self.payment]:
-            w.setEnabled(False)
-        self.table.setEnabled(False)
-        self.btn_save.setEnabled(False)
-        self.btn_add_line.setEnabled(False)
-        self.btn_delete.setEnabled(True)
-        self.btn_edit.setEnabled(True)
-        self.attach_section.set_view_mode(True)
-        self.note_section.set_view_mode(True)
-
-    def set_edit_mode(self):
-        self.view_mode = False
-        for w in [self.date, self.store, self.currency, self.payment]:
-            w.setEnabled(True)
-        self.table.setEnabled(True)
-        self.btn_save.setEnabled(True)
-        self.btn_add_line.setEnabled(True)
-        self.btn_delete.setEnabled(True)
-        self.btn_edit.setEnabled(False)
-        self.btn_cancel.setText("Cancel")
-        self.attach_section.set_view_mode(False)
-        self.note_section.set_edit_mode()
+        self._ccy_norm = (ccy.strip().upper() if ccy else "") or self.dom
+        self._refresh_original_amount_header(self._ccy_norm)
+        self.table.setColumnHidden(2, self._ccy_norm == self.dom)
 
     def add_line(self):
         row = self.table.rowCount()
         self.table.insertRow(row)
+        self._populate_row(row)
+        self.table.setColumnHidden(2, self._ccy_norm == self.dom)
 
+    def _populate_row(self, row: int):
         cat = QComboBox()
-        for name in self.cat_map.keys():
-            cat.addItem(name)
+        cat.setModel(self.cat_model)
         self.table.setCellWidget(row, 0, cat)
 
-        sp = QDoubleSpinBox()
-        sp.setRange(-10_000_000, 10_000_000)
-        sp.setDecimals(2)
-        sp.setSingleStep(1.0)
+        sp = make_amount_spinbox()
         self.table.setCellWidget(row, 1, sp)
 
-        sp2 = QDoubleSpinBox()
-        sp2.setRange(-10_000_000, 10_000_000)
-        sp2.setDecimals(2)
-        sp2.setSingleStep(1.0)
+        sp2 = make_amount_spinbox()
         self.table.setCellWidget(row, 2, sp2)
 
         rm = QPushButton("Remove")
-        rm.clicked.connect(lambda _, b=rm: self.remove_line_by_button(b))
+        rm.clicked.connect(self._remove_line_by_sender)
         self.table.setCellWidget(row, 3, rm)
+        self._row_widgets.append((cat, sp, sp2))
 
-        self.on_currency_changed(self.currency.text())
+    def _remove_line_by_sender(self):
+        btn = self.sender()
+        if isinstance(btn, QPushButton):
+            self.remove_line_by_button(btn)
 
     def remove_line_by_button(self, btn: QPushButton):
-        for r in range(self.table.rowCount()):
-            if self.table.cellWidget(r, 3) is btn:
-                self.table.removeRow(r)
-                return
+        # Cell widgets live in the viewport, so their position maps straight
+        # to the row they occupy.
+        r = self.table.indexAt(btn.pos()).row()
+        if r < 0 or self.table.cellWidget(r, 3) is not btn:
+            return
+        self.table.removeRow(r)
+        del self._row_widgets[r]
 
     def load_entry(self):
-        h = self.repo.get_entry_header(self.entry_uuid)
+        h, items = self.repo.get_entry_with_items(self.entry_uuid)
         if not h or h["entry_type"] != "EXPENSE":
             QMessageBox.critical(self, "Error", "Entry not found or not an EXPENSE entry.")
             self.reject()
@@ -3052,12 +3784,10 @@ class ExpenseJournalDetailDialog(QDialog):
         self.store.setText(h["entry_title"] or "")
         self.note_section.set_text(h["entry_text"] or "")
 
-        items = self.repo.get_entry_items(self.entry_uuid)
         if items:
             self.currency.setText(items[0]["currency_original"])
 
-        att = self.repo.get_attachment(self.entry_uuid)
-        self.attach_section.load_existing(att)
+        self.attach_section.load_for_entry(self.repo, self.entry_uuid)
 
         pay_code = None
         for it in items:
@@ -3070,40 +3800,40 @@ class ExpenseJournalDetailDialog(QDialog):
                     self.payment.setCurrentText(name)
                     break
 
+        lines = [it for it in items if it["account_type"] == "EXPENSE" and it["dc"] == "D"]
         self.table.setRowCount(0)
-        for it in items:
-            if it["account_type"] == "EXPENSE" and it["dc"] == "D":
-                self.add_line()
-                row = self.table.rowCount() - 1
-                cat = self.table.cellWidget(row, 0)
-                sp = self.table.cellWidget(row, 1)
-                sp2 = self.table.cellWidget(row, 2)
-                assert isinstance(cat, QComboBox) and isinstance(sp, QDoubleSpinBox) and isinstance(sp2, QDoubleSpinBox)
+        self._row_widgets.clear()
+        with bulk_fill_table(self.table, len(lines)):
+            for row, it in enumerate(lines):
+                self._populate_row(row)
+                cat, sp, sp2 = self._row_widgets[-1]
                 cat.setCurrentText(it["account_name"])
                 sp.setValue(float(it["amount_domestic"]))
                 if it["amount_original"] is not None:
                     sp2.setValue(float(it["amount_original"]))
         self.on_currency_changed(self.currency.text())
 
+    def _header_fields(self) -> Tuple[str, Optional[str]]:
+        return "EXPENSE", self.store.text().strip() or None
+
     def _collect_items(self) -> List[Dict[str, Any]]:
-        ccy_raw = self.currency.text().strip().upper()
-        ccy = ccy_raw or self.dom
+        ccy = self._ccy_norm
         is_foreign = (ccy != self.dom)
 
-        items: List[Dict[str, Any]] = []
-        total_dom = 0.0
-        total_org = 0.0
-
-        for r in range(self.table.rowCount()):
-            cat = self.table.cellWidget(r, 0)
-            sp = self.table.cellWidget(r, 1)
-            sp2 = self.table.cellWidget(r, 2)
-            if not (isinstance(cat, QComboBox) and isinstance(sp, QDoubleSpinBox) and isinstance(sp2, QDoubleSpinBox)):
-                continue
-            name = cat.currentText()
-            code = self.cat_map.get(name)
-            if not code:
+        pay_code = self.payment_map.get(self.payment.currentText())
+        if not pay_code:
+            raise ValueError("Payment account is required")
+
+        # Validate every line into plain tuples first; dicts are only built
+        # once the whole table has passed.
+        rows: List[Tuple[str, float, float]] = []
+        cat_codes = self.cat_codes
+        n_cats = len(cat_codes)
+        for cat, sp, sp2 in self._row_widgets:
+            i = cat.currentIndex()
+            if not 0 <= i < n_cats:
                 raise ValueError("Invalid expense category selection")
+            code = cat_codes[i]
             amt_dom = float(sp.value())
             if abs(amt_dom) < 1e-9:
                 continue  # allow negative; just skip true zero rows
@@ -3113,89 +3843,55 @@ class ExpenseJournalDetailDialog(QDialog):
                     raise ValueError("Original amount is required when currency is foreign and cannot be zero")
             else:
                 amt_org = amt_dom
-            items.append({
+            rows.append((code, amt_dom, amt_org))
+
+        if not rows:
+            raise ValueError("Add at least one expense line with non-zero amount")
+
+        items: List[Dict[str, Any]] = [
+            {
                 "account_code": code,
                 "dc": "D",
                 "amount_domestic": amt_dom,
                 "currency_original": ccy,
                 "amount_original": amt_org,
                 "item_text": None,
-            })
-            total_dom += amt_dom
-            total_org += amt_org
-
-        if not items:
-            raise ValueError("Add at least one expense line with non-zero amount")
-
-        pay_name = self.payment.currentText()
-        pay_code = self.payment_map.get(pay_name)
-        if not pay_code:
-            raise ValueError("Payment account is required")
-
+            }
+            for code, amt_dom, amt_org in rows
+        ]
         items.append({
             "account_code": pay_code,
             "dc": "C",
-            "amount_domestic": total_dom,
+            "amount_domestic": math.fsum(r[1] for r in rows),
             "currency_original": ccy,
-            "amount_original": total_org,
+            "amount_original": math.fsum(r[2] for r in rows),
             "item_text": None,
         })
         return items
 
-    def on_save(self):
-        try:
-            accounting_date = qdate_to_iso(self.date.date())
-            entry_title = self.store.text().strip() or None
-            entry_text = self.note_section.text().strip() or None
 
-            if self.is_new:
-                self.entry_uuid = new_uuid()
+@dataclass(slots=True)
+class _LineWidgets:
+    """Cell widgets of one general journal line, kept so reads never go back
+    through QTableWidget.cellWidget."""
+    acc: QComboBox
+    dc: QComboBox
+    amt: QDoubleSpinBox
+    ccy: QComboBox
+    org: QDoubleSpinBox
+    note: QLineEdit
 
-            items = self._collect_items()
-
-            self.repo.save_entry_full_replace(
-                entry_uuid=self.entry_uuid,
-                accounting_date=accounting_date,
-                entry_type="EXPENSE",
-                entry_title=entry_title,
-                entry_text=entry_text,
-                items=items,
-                is_new=self.is_new,
-            )
-            self.is_new = False
-            self.attach_section.save(self.repo, self.entry_uuid)
-            QMessageBox.information(self, "Saved", "Entry saved.")
-            self.accept()
-        except Exception as e:
-            QMessageBox.critical(self, "Save failed", str(e))
 
-    def on_delete(self):
-        if self.is_new or not self.entry_uuid:
-            return
-        if QMessageBox.question(self, "Delete", "Delete this entry?") != QMessageBox.Yes:
-            return
-        try:
-            self.repo.delete_entry(self.entry_uuid)
-            QMessageBox.information(self, "Deleted", "Entry deleted.")
-            self.accept()
-        except Exception as e:
-            QMessageBox.critical(self, "Delete failed", str(e))
-
-
-class GeneralJournalDetailDialog(QDialog):
+class GeneralJournalDetailDialog(_JournalDialogMixin, QDialog):
     def __init__(self, repo: Repo, entry_uuid: Optional[str] = None, parent=None, start_edit_mode: bool = False):
         super().__init__(parent)
         self.repo = repo
         self.dom = self.repo.get_domestic_currency()
-        self.entry_uuid = entry_uuid
-        self.is_new = entry_uuid is None
-        self.start_edit_mode = start_edit_mode
+        self.dirty = False  # set once the repo has actually been written
 
-        self.setWindowTitle("General Journal Detail" if self.is_new else "General Journal Detail (View/Edit)")
         self.resize(860, 560)
 
         root = QVBoxLayout(self)
-        self.view_mode = not self.is_new
 
         form = QFormLayout()
         self.entry_type = QComboBox()
@@ -3228,7 +3924,7 @@ class GeneralJournalDetailDialog(QDialog):
         self.btn_delete = QPushButton("Delete")
         self.btn_add_line = QPushButton("Add line")
         self.btn_save = QPushButton("Save")
-        self.btn_cancel = QPushButton("Close" if self.view_mode else "Cancel")
+        self.btn_cancel = QPushButton("Cancel")
         self.btn_save.setDefault(True)
 
         btn_row.addWidget(self.btn_edit)
@@ -3245,14 +3941,48 @@ class GeneralJournalDetailDialog(QDialog):
         self.btn_cancel.clicked.connect(self.reject)
         self.btn_delete.clicked.connect(self.on_delete)
 
-        self.accounts = self.repo.list_accounts("is_active=1")
-        self.account_map = {r["account_name"]: r["account_code"] for r in self.accounts}
-        self.attach_section.set_view_mode(self.view_mode)
-        self.note_section.set_view_mode(self.view_mode)
+        self.accounts: List[sqlite3.Row] = []
+        self.account_codes: List[str] = []
+        self.accounts_model: Optional[QStandardItemModel] = None
+        self.ccy_model = shared_currency_model(self.dom)
+        self._lines: List[_LineWidgets] = []
+        # Set once any line's currency leaves self.dom; until then
+        # _collect_items can skip reading the currency combos.
+        self._has_foreign = False
+        # Widgets toggled together by set_view_mode / set_edit_mode.
+        self._mode_widgets = (self.entry_type, self.date, self.title, self.table, self.btn_save, self.btn_add_line)
+        self._mode: Optional[str] = None
+        self.reset(entry_uuid, start_edit_mode)
+
+    def reset(self, entry_uuid: Optional[str] = None, start_edit_mode: bool = False):
+        """Reload the dialog for another entry (or a blank new one).
+
+        Callers keep a single instance and call this before each exec(),
+        so the widget tree is built once and only the data is refreshed.
+        """
+        self.entry_uuid = entry_uuid
+        self.is_new = entry_uuid is None
+        self.start_edit_mode = start_edit_mode
+        self.dirty = False
+        self.view_mode = not self.is_new
+        self._mode = None  # force the set_*_mode call below to apply fully
+
+        self.setWindowTitle("General Journal Detail" if self.is_new else "General Journal Detail (View/Edit)")
+        self.btn_cancel.setText("Close" if self.view_mode else "Cancel")
+        self.btn_edit.setVisible(not self.is_new)
+        self.btn_delete.setVisible(not self.is_new)
+
+        self.table.setRowCount(0)
+        self._lines.clear()
+        self._has_foreign = False
+        self.accounts, self.accounts_model, self.account_codes = shared_active_accounts(self.repo)
+        self.entry_type.setCurrentIndex(0)
+        self.date.setDate(QDate.currentDate())
+        self.title.clear()
+        self.note_section.clear()
+        self.attach_section.load_existing(None)
 
         if self.is_new:
-            self.btn_edit.setVisible(False)
-            self.btn_delete.setVisible(False)
             self.set_edit_mode()
             self.add_line()
             self.add_line()
@@ -3267,78 +3997,58 @@ class GeneralJournalDetailDialog(QDialog):
     def on_attachment_clicked(self):
         self.attach_section.on_attachment_clicked()
 
-    def set_view_mode(self):
-        self.view_mode = True
-        for w in [self.entry_type, self.date, self.title]:
-            w.setEnabled(False)
-        self.table.setEnabled(False)
-        self.btn_save.setEnabled(False)
-        self.btn_add_line.setEnabled(False)
-        self.btn_delete.setEnabled(True)
-        self.btn_edit.setEnabled(True)
-        self.attach_section.set_view_mode(True)
-        self.note_section.set_view_mode(True)
-
-    def set_edit_mode(self):
-        self.view_mode = False
-        for w in [self.entry_type, self.date, self.title]:
-            w.setEnabled(True)
-        self.table.setEnabled(True)
-        self.btn_save.setEnabled(True)
-        self.btn_add_line.setEnabled(True)
-        self.btn_delete.setEnabled(True)
-        self.btn_edit.setEnabled(False)
-        self.btn_cancel.setText("Cancel")
-        self.attach_section.set_view_mode(False)
-        self.note_section.set_edit_mode()
-
     def add_line(self):
         row = self.table.rowCount()
         self.table.insertRow(row)
+        self._populate_row(row)
 
+    def _populate_row(self, row: int):
         acc = QComboBox()
-        for r in self.accounts:
-            acc.addItem(r["account_name"])
+        acc.setModel(self.accounts_model)
         self.table.setCellWidget(row, 0, acc)
 
         dc = QComboBox()
-        dc.addItems(["D", "C"])
+        dc.addItems(_DC_ITEMS)
         self.table.setCellWidget(row, 1, dc)
 
-        amt = QDoubleSpinBox()
-        amt.setRange(-10_000_000, 10_000_000)
-        amt.setDecimals(2)
-        amt.setSingleStep(1.0)
+        amt = make_amount_spinbox()
         self.table.setCellWidget(row, 2, amt)
 
         ccy = QComboBox()
-        for c in [self.dom, "USD", "EUR", "JPY", "CNY"]:
-            if ccy.findText(c) < 0:
-                ccy.addItem(c)
+        ccy.setModel(self.ccy_model)
         ccy.setCurrentText(self.dom)
+        ccy.currentTextChanged.connect(self._on_line_currency_changed)
         self.table.setCellWidget(row, 3, ccy)
 
-        org = QDoubleSpinBox()
-        org.setRange(-10_000_000, 10_000_000)
-        org.setDecimals(2)
-        org.setSingleStep(1.0)
+        org = make_amount_spinbox()
         self.table.setCellWidget(row, 4, org)
 
         note = QLineEdit()
         self.table.setCellWidget(row, 5, note)
 
         rm = QPushButton("Remove")
-        rm.clicked.connect(lambda _, b=rm: self.remove_line_by_button(b))
+        rm.clicked.connect(self._remove_line_by_sender)
         self.table.setCellWidget(row, 6, rm)
+        self._lines.append(_LineWidgets(acc, dc, amt, ccy, org, note))
+
+    def _on_line_currency_changed(self, ccy: str):
+        if ccy != self.dom:
+            self._has_foreign = True
+
+    def _remove_line_by_sender(self):
+        btn = self.sender()
+        if isinstance(btn, QPushButton):
+            self.remove_line_by_button(btn)
 
     def remove_line_by_button(self, btn: QPushButton):
-        for r in range(self.table.rowCount()):
-            if self.table.cellWidget(r, 6) is btn:
-                self.table.removeRow(r)
-                return
+        r = self.table.indexAt(btn.pos()).row()
+        if r < 0 or self.table.cellWidget(r, 6) is not btn:
+            return
+        self.table.removeRow(r)
+        del self._lines[r]
 
     def load_entry(self):
-        h = self.repo.get_entry_header(self.entry_uuid)
+        h, items = self.repo.get_entry_with_items(self.entry_uuid)
         if not h:
             QMessageBox.critical(self, "Error", "Entry not found.")
             self.reject()
@@ -3348,114 +4058,73 @@ class GeneralJournalDetailDialog(QDialog):
         self.title.setText(h["entry_title"] or "")
         self.note_section.set_text(h["entry_text"] or "")
 
-        att = self.repo.get_attachment(self.entry_uuid)
-        self.attach_section.load_existing(att)
+        self.attach_section.load_for_entry(self.repo, self.entry_uuid)
 
-        items = self.repo.get_entry_items(self.entry_uuid)
         self.table.setRowCount(0)
-        for it in items:
-            self.add_line()
-            row = self.table.rowCount() - 1
-            acc = self.table.cellWidget(row, 0)
-            dc = self.table.cellWidget(row, 1)
-            amt = self.table.cellWidget(row, 2)
-            ccy = self.table.cellWidget(row, 3)
-            org = self.table.cellWidget(row, 4)
-            note = self.table.cellWidget(row, 5)
-            assert isinstance(acc, QComboBox) and isinstance(dc, QComboBox)
-            assert isinstance(amt, QDoubleSpinBox) and isinstance(ccy, QComboBox) and isinstance(org, QDoubleSpinBox)
-            assert isinstance(note, QLineEdit)
-
-            acc.setCurrentText(it["account_name"])
-            dc.setCurrentText(it["dc"])
-            amt.setValue(float(it["amount_domestic"]))
-            ccy.setCurrentText(it["currency_original"])
-            if it["amount_original"] is not None:
-                org.setValue(float(it["amount_original"]))
-            note.setText(it["item_text"] or "")
+        self._lines.clear()
+        # Only the currency combos have a slot connected; block it per line and
+        # work out the foreign-currency flag once from the loaded rows instead.
+        dom = self.dom
+        with bulk_fill_table(self.table, len(items)):
+            for row, it in enumerate(items):
+                self._populate_row(row)
+                line = self._lines[-1]
+                line.acc.setCurrentText(it["account_name"])
+                line.dc.setCurrentText(it["dc"])
+                line.amt.setValue(float(it["amount_domestic"]))
+                with QSignalBlocker(line.ccy):
+                    line.ccy.setCurrentText(it["currency_original"])
+                if it["amount_original"] is not None:
+                    line.org.setValue(float(it["amount_original"]))
+                line.note.setText(it["item_text"] or "")
+        self._has_foreign = any(it["currency_original"] != dom for it in items)
+
+    def _header_fields(self) -> Tuple[str, Optional[str]]:
+        return self.entry_type.currentText(), self.title.text().strip() or None
 
     def _collect_items(self) -> List[Dict[str, Any]]:
-        items: List[Dict[str, Any]] = []
-        for r in range(self.table.rowCount()):
-            acc = self.table.cellWidget(r, 0)
-            dc = self.table.cellWidget(r, 1)
-            amt = self.table.cellWidget(r, 2)
-            ccy = self.table.cellWidget(r, 3)
-            org = self.table.cellWidget(r, 4)
-            note = self.table.cellWidget(r, 5)
-            if not all([
-                isinstance(acc, QComboBox), isinstance(dc, QComboBox), isinstance(amt, QDoubleSpinBox),
-                isinstance(ccy, QComboBox), isinstance(org, QDoubleSpinBox), isinstance(note, QLineEdit)
-            ]):
-                continue
-            name = acc.currentText()
-            account_code = self.account_map.get(name)
-            if not account_code:
+        # Validate every line into plain tuples first; dicts are only built
+        # once the whole table has passed.
+        rows: List[Tuple[str, str, float, str, float, Optional[str]]] = []
+        append = rows.append
+        account_codes = self.account_codes
+        n_accounts = len(account_codes)
+        dom = self.dom
+        has_foreign = self._has_foreign
+        for line in self._lines:
+            i = line.acc.currentIndex()
+            if not 0 <= i < n_accounts:
                 raise ValueError("Invalid account selection")
+            account_code = account_codes[i]
 
-            amt_dom = float(amt.value())
+            amt_dom = float(line.amt.value())
             if abs(amt_dom) < 1e-9:
                 continue
 
-            cur = ccy.currentText()
-            if cur == self.dom:
-                amt_org = float(org.value()) if abs(org.value()) > 1e-9 else amt_dom
+            cur = line.ccy.currentText() if has_foreign else dom
+            if cur == dom:
+                org_val = line.org.value()
+                amt_org = float(org_val) if abs(org_val) > 1e-9 else amt_dom
             else:
-                amt_org = float(org.value())
+                amt_org = float(line.org.value())
                 if abs(amt_org) < 1e-9:
                     raise ValueError("Original amount is required for foreign currency lines and cannot be zero")
 
-            items.append({
+            append((account_code, line.dc.currentText(), amt_dom, cur, amt_org, line.note.text().strip() or None))
+        if not rows:
+            raise ValueError("Add at least one line with non-zero amount")
+        return [
+            {
                 "account_code": account_code,
-                "dc": dc.currentText(),
+                "dc": dc,
                 "amount_domestic": amt_dom,
                 "currency_original": cur,
                 "amount_original": amt_org,
-                "item_text": note.text().strip() or None,
-            })
-        if not items:
-            raise ValueError("Add at least one line with non-zero amount")
-        return items
-
-    def on_save(self):
-        try:
-            accounting_date = qdate_to_iso(self.date.date())
-            entry_type = self.entry_type.currentText()
-            title = self.title.text().strip() or None
-            note = self.note_section.text().strip() or None
-
-            if self.is_new:
-                self.entry_uuid = new_uuid()
-
-            items = self._collect_items()
-
-            self.repo.save_entry_full_replace(
-                entry_uuid=self.entry_uuid,
-                accounting_date=accounting_date,
-                entry_type=entry_type,
-                entry_title=title,
-                entry_text=note,
-                items=items,
-                is_new=self.is_new,
-            )
-            self.is_new = False
-            self.attach_section.save(self.repo, self.entry_uuid)
-            QMessageBox.information(self, "Saved", "Entry saved.")
-            self.accept()
-        except Exception as e:
-            QMessageBox.critical(self, "Save failed", str(e))
+                "item_text": note,
+            }
+            for account_code, dc, amt_dom, cur, amt_org, note in rows
+        ]
 
-    def on_delete(self):
-        if self.is_new or not self.entry_uuid:
-            return
-        if QMessageBox.question(self, "Delete", "Delete this entry?") != QMessageBox.Yes:
-            return
-        try:
-            self.repo.delete_entry(self.entry_uuid)
-            QMessageBox.information(self, "Deleted", "Entry deleted.")
-            self.accept()
-        except Exception as e:
-            QMessageBox.critical(self, "Delete failed", str(e))
 
 
 class BalanceSheetAccountEditDialog(QDialog):
@@ -3466,6 +4135,7 @@ class BalanceSheetAccountEditDialog(QDialog):
         self.repo = repo
         self.account_code = account_code
         self.is_new = account_code is None
+        self.dirty = False
 
         self.setWindowTitle("Add Balance Sheet Account" if self.is_new else "Balance Sheet Account Detail")
         self.resize(420, 220)
@@ -3546,6 +4216,7 @@ class BalanceSheetAccountEditDialog(QDialog):
                 self.account_code = self.repo.create_user_managed_account(nm, t, is_active)
             else:
                 self.repo.update_user_managed_account(self.account_code, nm, is_active)
+            self.dirty = True
             QMessageBox.information(self, "Saved", "Account saved.")
             self.accept()
         except Exception as e:
@@ -3558,13 +4229,19 @@ class BalanceSheetAccountDetailDialog(QDialog):
     def __init__(self, repo: Repo, parent=None):
         super().__init__(parent)
         self.repo = repo
+        self.dirty = False
         self.setWindowTitle("Balance Sheet Account Detail")
         self.resize(720, 460)
 
         root = QVBoxLayout(self)
-        self.list = QListWidget()
+        self.list = QListView()
         self.list.setSpacing(6)
-        self.list.itemDoubleClicked.connect(self.on_item_activated)
+        delegate = AccountDelegate(self.list)
+        delegate.editRequested.connect(self.edit_account)
+        self.list.setItemDelegate(delegate)
+        self.model = CardListModel(self.list)
+        self.list.setModel(self.model)
+        self.list.doubleClicked.connect(self.on_item_activated)
         root.addWidget(self.list)
 
         btn_row = QHBoxLayout()
@@ -3584,90 +4261,50 @@ class BalanceSheetAccountDetailDialog(QDialog):
         self.refresh()
 
     def refresh(self):
-        self.list.clear()
+        self.model.reset(self._payloads())
+
+    def _payloads(self) -> List[Dict[str, Any]]:
         rows = self.repo.list_user_managed_bs_accounts()
+        out: List[Dict[str, Any]] = []
         current_section = None
         for r in rows:
             is_active = int(r["is_active"])
-            if is_active == 0:
-                section = "Inactive"
-            else:
-                section = ACCOUNT_TYPE_LABEL.get(r["account_type"], r["account_type"])
+            account_type = r["account_type"]
+            type_label = ACCOUNT_TYPE_LABEL.get(account_type, account_type)
+            section = type_label if is_active else "Inactive"
 
             if section != current_section:
-                self.list.addItem(SectionHeaderItem(section))
+                out.append(section_payload(section))
                 current_section = section
 
             payload = {
                 "kind": "row",
                 "account_code": r["account_code"],
                 "account_name": r["account_name"],
-                "account_type": r["account_type"],
+                "account_type": account_type,
+                "type_label": type_label,
+                "icon": bs_icon(r["account_code"], account_type),
                 "is_active": is_active,
             }
-            item = CardRowItem(payload)
-            self.list.addItem(item)
-
-            w = QWidget()
-            lay = QHBoxLayout(w)
-            lay.setContentsMargins(10, 8, 10, 8)
-            lay.setSpacing(10)
-
-            icon = QLabel(bs_icon(r["account_code"], r["account_type"]))
-            icon.setFixedWidth(24)
-            icon.setAlignment(Qt.AlignCenter)
-
-            text_col = QVBoxLayout()
-            text_col.setContentsMargins(0, 0, 0, 0)
-            text_col.setSpacing(2)
-            name_lbl = QLabel(r["account_name"])
-            name_lbl.setWordWrap(False)
-            name_lbl.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
-            name_lbl.setMinimumWidth(200)
-            type_lbl = QLabel(ACCOUNT_TYPE_LABEL.get(r["account_type"], r["account_type"]))
-            type_lbl.setStyleSheet("color: #666; font-size: 12px;")
-            text_col.addWidget(name_lbl)
-            text_col.addWidget(type_lbl)
-
-            active_lbl = QLabel("Active" if r["is_active"] else "Inactive")
-            if r["is_active"]:
-                active_lbl.setStyleSheet("color: #0a7a0a;")
-            else:
-                active_lbl.setStyleSheet("color: #a00;")
-            active_lbl.setSizePolicy(QSizePolicy.Minimum, QSizePolicy.Preferred)
-
-            edit_btn = QPushButton("Edit")
-            edit_btn.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
-            edit_btn.clicked.connect(lambda _, code=r["account_code"]: self.edit_account(code))
-
-            lay.addWidget(icon)
-            lay.addLayout(text_col, 1)
-            lay.addStretch(1)
-
-            right_col = QVBoxLayout()
-            right_col.setContentsMargins(0, 0, 0, 0)
-            right_col.setSpacing(6)
-            right_col.addWidget(active_lbl, alignment=Qt.AlignRight | Qt.AlignVCenter)
-            right_col.addWidget(edit_btn, alignment=Qt.AlignRight | Qt.AlignVCenter)
-            lay.addLayout(right_col)
+            out.append(payload)
+        return out
 
-            self.list.setItemWidget(item, w)
-            item.setSizeHint(QSize(10, 64))
-
-    def on_item_activated(self, item: QListWidgetItem):
-        data = item.data(Qt.UserRole) or {}
+    def on_item_activated(self, index: QModelIndex):
+        data = index.data(Qt.UserRole) or {}
         if data.get("kind") != "row":
             return
         self.edit_account(data["account_code"])
 
     def edit_account(self, account_code: str):
         dlg = BalanceSheetAccountEditDialog(self.repo, account_code, parent=self)
-        if dlg.exec() == QDialog.Accepted:
+        if dlg.exec() == QDialog.Accepted and dlg.dirty:
+            self.dirty = True
             self.refresh()
 
     def add_account(self):
         dlg = BalanceSheetAccountEditDialog(self.repo, account_code=None, parent=self)
-        if dlg.exec() == QDialog.Accepted:
+        if dlg.exec() == QDialog.Accepted and dlg.dirty:
+            self.dirty = True
             self.refresh()
 
 
@@ -3786,19 +4423,17 @@ class InsightHome(QWidget):
         self.stack = QStackedWidget()
         root.addWidget(self.stack, 1)
 
-        self.page_expense = JournalCardList(repo, mode="expense")
-        self.page_bs = BalanceSheetOverviewWidget(repo)
-        self.page_exp_trend = ExpenseTrendChart(repo)
-        self.page_assets_trend = AssetsTrendChart(repo)
-        self.stack.addWidget(self.page_expense)
-        self.stack.addWidget(self.page_bs)
-        self.stack.addWidget(self.page_exp_trend)
-        self.stack.addWidget(self.page_assets_trend)
+        # Root pages query the DB as soon as they are built, so each one starts
+        # as a placeholder and is swapped in the first time it is shown.
+        self._pages: List[Optional[QWidget]] = [None] * 4
+        for _ in self._pages:
+            self.stack.addWidget(QWidget())
+        # Built pages whose data changed while they were hidden; refreshed on
+        # their next switch_root/go_back instead of eagerly.
+        self._stale = [False] * len(self._pages)
 
         self.nav_stack: List[Tuple[int, str]] = []
-
-        self.page_expense.on_open_entry = self.open_entry_general
-        self.page_bs.on_open_account = self.open_account_transactions
+        self._entry_dlg: Optional[GeneralJournalDetailDialog] = None
 
         self.btn_expense.clicked.connect(lambda: self.switch_root(0))
         self.btn_bs.clicked.connect(lambda: self.switch_root(1))
@@ -3807,6 +4442,38 @@ class InsightHome(QWidget):
         self._set_segment_checked(0)
         self._update_manage_button()
 
+    def _build_page(self, idx: int) -> QWidget:
+        if idx == 0:
+            page = JournalCardList(self.repo, mode="expense")
+            page.on_open_entry = self.open_entry_general
+        elif idx == 1:
+            page = BalanceSheetOverviewWidget(self.repo)
+            page.on_open_account = self.open_account_transactions
+        elif idx == 2:
+            page = ExpenseTrendChart(self.repo)
+        else:
+            page = AssetsTrendChart(self.repo)
+        return page
+
+    def _ensure_page(self, idx: int) -> bool:
+        """Build root page `idx` if it is still a placeholder; returns True
+        when it was just built (and is therefore already up to date)."""
+        if not 0 <= idx < len(self._pages) or self._pages[idx] is not None:
+            return False
+        page = self._pages[idx] = self._build_page(idx)
+        placeholder = self.stack.widget(idx)
+        was_current = self.stack.currentIndex() == idx
+        self.stack.insertWidget(idx, page)
+        self.stack.removeWidget(placeholder)
+        placeholder.deleteLater()
+        if was_current:
+            self.stack.setCurrentIndex(idx)
+        return True
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._ensure_page(self.stack.currentIndex())
+
     def _set_segment_checked(self, idx: int):
         self.btn_expense.setChecked(idx == 0)
         self.btn_bs.setChecked(idx == 1)
@@ -3816,14 +4483,19 @@ class InsightHome(QWidget):
     def switch_root(self, idx: int):
         self.nav_stack.clear()
         self.back.setEnabled(False)
+        fresh = self._ensure_page(idx)
         self.stack.setCurrentIndex(idx)
         self._set_segment_checked(idx)
         titles = ["My Expenses", "My Accounts", "Expense Trend", "Assets Trend"]
         self.title.setText(titles[idx] if 0 <= idx < len(titles) else "")
-        self.refresh_current()
+        if not fresh and self._stale[idx]:
+            self.refresh_current()
         self._update_manage_button()
 
     def refresh_current(self):
+        idx = self.stack.currentIndex()
+        if 0 <= idx < len(self._stale):
+            self._stale[idx] = False
         w = self.stack.currentWidget()
         if isinstance(w, JournalCardList):
             w.refresh()
@@ -3838,16 +4510,22 @@ class InsightHome(QWidget):
         if not self.nav_stack:
             return
         idx, title = self.nav_stack.pop()
+        fresh = self._ensure_page(idx)
         self.stack.setCurrentIndex(idx)
         self._set_segment_checked(idx)
         self.title.setText(title)
         self.back.setEnabled(len(self.nav_stack) > 0)
-        self.refresh_current()
+        # Drill-down pages have no stale flag and are always reloaded.
+        if not fresh and (idx >= len(self._stale) or self._stale[idx]):
+            self.refresh_current()
         self._update_manage_button()
 
     def open_entry_general(self, entry_uuid: str):
-        dlg = GeneralJournalDetailDialog(self.repo, entry_uuid=entry_uuid, parent=self)
-        if dlg.exec():
+        if self._entry_dlg is None:
+            self._entry_dlg = GeneralJournalDetailDialog(self.repo, entry_uuid=entry_uuid, parent=self)
+        else:
+            self._entry_dlg.reset(entry_uuid)
+        if self._entry_dlg.exec() and self._entry_dlg.dirty:
             self.refresh_all()
 
     def open_account_transactions(self, account_code: str, account_name: str):
@@ -3864,10 +4542,9 @@ class InsightHome(QWidget):
         self._update_manage_button()
 
     def refresh_all(self):
-        self.page_expense.refresh()
-        self.page_bs.refresh()
-        self.page_exp_trend.refresh()
-        self.page_assets_trend.refresh()
+        # Only the visible page reloads now; other built pages are marked stale
+        # and reload when next shown. Pages not built yet load fresh data then.
+        self._stale = [page is not None for page in self._pages]
         self.refresh_current()
         self._update_manage_button()
 
@@ -3888,9 +4565,13 @@ class MainWindow(QMainWindow):
         self.importer = JsonExpenseImportService(repo)
         self.prompt_builder = PromptBuilder(repo, os.path.join(os.path.dirname(__file__), "JSON Schema.json"))
         self.busy_overlay = BusyOverlay(self)
+        # Polish up front so the first "Feed" tap only has to show/raise it
+        self.busy_overlay.ensurePolished()
         self.ai_controller: Optional[AiImportController] = None
         self.gemini_error: Optional[str] = None
         self.gemini_client: Optional[GeminiClient] = None
+        self._expense_dlg: Optional[ExpenseJournalDetailDialog] = None
+        self._general_dlg: Optional[GeneralJournalDetailDialog] = None
         try:
             gemini_client = GeminiClient()
             self.gemini_client = gemini_client
@@ -4055,22 +4736,45 @@ class MainWindow(QMainWindow):
         container_layout.addWidget(tabs)
         self.setCentralWidget(container)
 
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.busy_overlay.isVisible():
+            self.busy_overlay.setGeometry(self.rect())
+
     def refresh_all(self):
         self.insight.refresh_all()
 
+    def _expense_dialog(self, entry_uuid: Optional[str], start_edit: bool = False) -> ExpenseJournalDetailDialog:
+        if self._expense_dlg is None:
+            self._expense_dlg = ExpenseJournalDetailDialog(
+                self.repo, entry_uuid=entry_uuid, parent=self, start_edit_mode=start_edit
+            )
+        else:
+            self._expense_dlg.reset(entry_uuid, start_edit)
+        return self._expense_dlg
+
+    def _general_dialog(self, entry_uuid: Optional[str], start_edit: bool = False) -> GeneralJournalDetailDialog:
+        if self._general_dlg is None:
+            self._general_dlg = GeneralJournalDetailDialog(
+                self.repo, entry_uuid=entry_uuid, parent=self, start_edit_mode=start_edit
+            )
+        else:
+            self._general_dlg.reset(entry_uuid, start_edit)
+        return self._general_dlg
+
     def new_expense(self):
-        dlg = ExpenseJournalDetailDialog(self.repo, entry_uuid=None, parent=self)
-        if dlg.exec():
+        dlg = self._expense_dialog(None)
+        if dlg.exec() and dlg.dirty:
             self.refresh_all()
 
     def new_general(self):
-        dlg = GeneralJournalDetailDialog(self.repo, entry_uuid=None, parent=self)
-        if dlg.exec():
+        dlg = self._general_dialog(None)
+        if dlg.exec() and dlg.dirty:
             self.refresh_all()
 
     def open_expense_entry(self, entry_uuid: str, start_edit: bool = False):
-        dlg = ExpenseJournalDetailDialog(self.repo, entry_uuid=entry_uuid, parent=self, start_edit_mode=start_edit)
-        if dlg.exec():
+        dlg = self._expense_dialog(entry_uuid, start_edit)
+        if dlg.exec() and dlg.dirty:
             self.refresh_all()
 
     def _invoke_ai(self, mode: str):
@@ -4103,28 +4807,46 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "Import failed", str(e))
             return
 
-        dlg = GeneralJournalDetailDialog(
-            self.repo,
-            entry_uuid=result.entry_uuid,
-            parent=self,
-            start_edit_mode=True,
-        )
+        dlg = self._general_dialog(result.entry_uuid, start_edit=True)
         dlg.exec()
         self.refresh_all()
 
     def manage_accounts(self):
         dlg = BalanceSheetAccountDetailDialog(self.repo, parent=self)
         dlg.exec()
-        self.refresh_all()
+        if dlg.dirty:
+            self.refresh_all()
+
+
+def _prepare_db(db_path: str, errors: List[BaseException]):
+    # Runs on a worker thread with its own connection; sqlite3 connections
+    # must not cross threads, so the GUI opens a fresh Repo afterwards.
+    try:
+        repo = Repo(db_path)
+        try:
+            repo.init_db()
+            repo.seed_sample_data_if_empty()
+        finally:
+            repo.close()
+    except BaseException as e:
+        errors.append(e)
 
 
 def main():
     db_path = "debibi.db"
-    repo = Repo(db_path)
-    repo.init_db()
-    repo.seed_sample_data_if_empty()
 
     app = QApplication(sys.argv)
+    db_errors: List[BaseException] = []
+    db_thread = threading.Thread(target=_prepare_db, args=(db_path, db_errors), daemon=True)
+    db_thread.start()
+
+    splash = None
+    splash_pix = QPixmap(os.path.join("assets", "debibi_loading.png"))
+    if not splash_pix.isNull():
+        splash = QSplashScreen(splash_pix.scaled(160, 160, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        splash.show()
+        app.processEvents()
+
     icon_path = os.path.join("assets", "debibi_icon.png")
     if os.path.exists(icon_path):
         app.setWindowIcon(QIcon(icon_path))
@@ -4135,8 +4857,14 @@ def main():
         }
         """
     )
+    db_thread.join()
+    if db_errors:
+        raise db_errors[0]
+    repo = Repo(db_path)
     w = MainWindow(repo)
     w.show()
+    if splash is not None:
+        splash.finish(w)
     rc = app.exec()
     repo.close()
     sys.exit(rc)